@@ -3,13 +3,17 @@ Flight Route Map – Streamlit App
 Run:  streamlit run app.py
 """
 
-import io
+import json
+import os
+import time
 from collections import Counter
 
-import pandas as pd
-import plotly.graph_objects as go
 import streamlit as st
-from pyproj import Geod
+
+from flightmap.diagnostics import FIRST_RENDER_TARGET_MS, Diagnostics
+from flightmap.styles import COLOR_THEMES, FLAT_STYLES, GLOBE_STYLES, REGIONS
+
+diag = Diagnostics()
 
 # ── Page config ───────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -19,194 +23,26 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# ── Airport database  (lon, lat, full name, region) ───────────────────────────
-# 'region' kept for internal stats only – never shown on hover
-AIRPORTS: dict[str, tuple] = {
-    # Mainland China
-    "HGH": (120.4333,  30.2295, "Hangzhou Xiaoshan",         "East Asia"),
-    "PVG": (121.8052,  31.1443, "Shanghai Pudong",            "East Asia"),
-    "SHA": (121.3361,  31.1981, "Shanghai Hongqiao",          "East Asia"),
-    "PEK": (116.5975,  40.0801, "Beijing Capital",            "East Asia"),
-    "CAN": (113.2988,  23.3924, "Guangzhou Baiyun",           "East Asia"),
-    "SZX": (113.8107,  22.6393, "Shenzhen Bao'an",            "East Asia"),
-    "TAO": (120.3744,  36.2661, "Qingdao Liuting",            "East Asia"),
-    "WNZ": (120.8530,  27.9122, "Wenzhou Longwan",            "East Asia"),
-    # HK / Macau / Taiwan
-    "HKG": (113.9185,  22.3080, "Hong Kong Intl",             "East Asia"),
-    "MFM": (113.5925,  22.1496, "Macau Intl",                 "East Asia"),
-    "TPE": (121.2325,  25.0777, "Taipei Taoyuan",             "East Asia"),
-    # Southeast Asia
-    "SIN": (103.9894,   1.3644, "Singapore Changi",           "Southeast Asia"),
-    "KUL": (101.7098,   2.7456, "Kuala Lumpur Intl",          "Southeast Asia"),
-    "BKK": (100.7501,  13.6811, "Bangkok Suvarnabhumi",       "Southeast Asia"),
-    "BWN": (114.9283,   4.9442, "Bandar Seri Begawan",        "Southeast Asia"),
-    # Japan / Korea
-    "NRT": (140.3929,  35.7668, "Tokyo Narita",               "East Asia"),
-    "HND": (139.7814,  35.5494, "Tokyo Haneda",               "East Asia"),
-    "KIX": (135.2380,  34.4272, "Osaka Kansai",               "East Asia"),
-    "ICN": (126.4505,  37.4602, "Seoul Incheon",              "East Asia"),
-    # Central Asia
-    "ALA": ( 76.8844,  43.3521, "Almaty",                     "Central Asia"),
-    "NQZ": ( 71.4669,  51.0222, "Nur-Sultan (Astana)",        "Central Asia"),
-    # Australia
-    "SYD": (151.1772, -33.9461, "Sydney Kingsford Smith",     "Oceania"),
-    "BNE": (153.1094, -27.3842, "Brisbane",                   "Oceania"),
-    # Europe
-    "FRA": (  8.5706,  50.0333, "Frankfurt Main",             "Europe"),
-    "TXL": ( 13.2877,  52.5597, "Berlin Tegel",               "Europe"),
-    "LHR": ( -0.4543,  51.4700, "London Heathrow",            "Europe"),
-    # North America – West
-    "SFO": (-122.375,  37.6189, "San Francisco Intl",         "North America"),
-    "OAK": (-122.221,  37.7126, "Oakland Intl",               "North America"),
-    "SJC": (-121.929,  37.3627, "San Jose Mineta",            "North America"),
-    "LAX": (-118.408,  33.9416, "Los Angeles Intl",           "North America"),
-    "SAN": (-117.190,  32.7336, "San Diego Intl",             "North America"),
-    "SEA": (-122.309,  47.4502, "Seattle-Tacoma",             "North America"),
-    "PDX": (-122.598,  45.5898, "Portland Intl",              "North America"),
-    "BOI": (-116.223,  43.5644, "Boise Airport",              "North America"),
-    "LAS": (-115.152,  36.0833, "Las Vegas Harry Reid",       "North America"),
-    # North America – South / Central
-    "AUS": ( -97.670,  30.1945, "Austin-Bergstrom",           "North America"),
-    "DFW": ( -97.040,  32.8998, "Dallas Fort Worth",          "North America"),
-    "IAH": ( -95.341,  29.9844, "Houston George Bush",        "North America"),
-    "JAN": ( -90.076,  32.3112, "Jackson-Medgar Wiley Evers", "North America"),
-    "ABQ": (-106.609,  35.0496, "Albuquerque Sunport",        "North America"),
-    "MIA": ( -80.291,  25.7959, "Miami Intl",                 "North America"),
-    "ATL": ( -84.428,  33.6407, "Atlanta Hartsfield-Jackson", "North America"),
-    "GSP": ( -82.221,  34.8954, "Greenville-Spartanburg",     "North America"),
-    "CHS": ( -80.040,  32.8986, "Charleston Intl",            "North America"),
-    "CLT": ( -80.943,  35.2140, "Charlotte Douglas",          "North America"),
-    "BNA": ( -86.678,  36.1245, "Nashville Intl",             "North America"),
-    # North America – East
-    "BOS": ( -71.005,  42.3656, "Boston Logan",               "North America"),
-    "JFK": ( -73.778,  40.6413, "New York JFK",               "North America"),
-    "EWR": ( -74.175,  40.6895, "Newark Liberty",             "North America"),
-    "RDU": ( -78.788,  35.8776, "Raleigh-Durham",             "North America"),
-    "MSN": ( -89.338,  43.1399, "Madison Dane County",        "North America"),
-    "MKE": ( -87.897,  42.9481, "Milwaukee Mitchell",         "North America"),
-    "STL": ( -90.370,  38.7487, "St. Louis Lambert",          "North America"),
-    "MSP": ( -93.222,  44.8848, "Minneapolis-Saint Paul",     "North America"),
-    # Canada
-    "YVR": (-123.183,  49.1951, "Vancouver Intl",             "North America"),
-    "YYZ": ( -79.631,  43.6777, "Toronto Pearson",            "North America"),
-}
-
-# ── Visual themes ─────────────────────────────────────────────────────────────
-GLOBE_STYLES = {
-    "🌿 Natural":  dict(land="rgb(55,105,55)",    ocean="rgb(20,70,130)",
-                        bg="rgb(10,30,60)",        coast="rgba(180,220,180,0.6)",
-                        country="rgba(180,210,180,0.3)"),
-    "🌑 Dark":     dict(land="rgb(35,35,35)",      ocean="rgb(12,22,45)",
-                        bg="rgb(5,5,15)",           coast="rgba(120,120,120,0.6)",
-                        country="rgba(80,80,80,0.4)"),
-    "🏜️ Sandy":   dict(land="rgb(195,165,110)",   ocean="rgb(75,140,195)",
-                        bg="rgb(55,110,165)",       coast="rgba(220,200,160,0.6)",
-                        country="rgba(160,140,100,0.4)"),
-    "🧊 Ice":      dict(land="rgb(215,228,240)",   ocean="rgb(145,195,230)",
-                        bg="rgb(175,210,235)",      coast="rgba(80,130,170,0.6)",
-                        country="rgba(100,130,160,0.3)"),
-}
-
-# Flat map uses same color dicts but with natural-earth projection
-FLAT_STYLES = GLOBE_STYLES  # reuse themes
-
-COLOR_THEMES = {
-    "Crimson Red":  "#DC143C",
-    "Royal Blue":   "#3A7BD5",
-    "Amber Gold":   "#FFC107",
-    "Emerald":      "#2ECC71",
-    "Neon Orange":  "#FF6600",
-    "Violet":       "#7B2FBE",
-    "Ice Blue":     "#00BFFF",
-    "Coral":        "#FF6B6B",
-}
-
-# Satellite tile (Esri World Imagery – free, no API key)
-_ESRI_SAT = ("https://server.arcgisonline.com/ArcGIS/rest/services/"
-             "World_Imagery/MapServer/tile/{z}/{y}/{x}")
-
-# ── Great-circle helpers ──────────────────────────────────────────────────────
-_geod = Geod(ellps="WGS84")
-
-
-def great_circle_path(lon1, lat1, lon2, lat2, npts=100):
-    """
-    Great-circle arc with None breaks at the antimeridian.
-
-    For go.Scattergeo this is the correct approach: Plotly's geo-projection
-    engine places both segments in the right screen position, so the break
-    (if any) is invisible at the ±180° meridian.
-
-    For go.Scattermapbox (satellite mode) we center the initial view near
-    the antimeridian so that both segments are inside the visible viewport.
-    """
-    if (lon1, lat1) == (lon2, lat2):
-        return [lon1], [lat1]
-    pts  = _geod.npts(lon1, lat1, lon2, lat2, npts)
-    lons = [lon1] + [p[0] for p in pts] + [lon2]
-    lats = [lat1] + [p[1] for p in pts] + [lat2]
-    out_lons, out_lats = [lons[0]], [lats[0]]
-    for i in range(1, len(lons)):
-        if abs(lons[i] - lons[i - 1]) > 180:
-            out_lons.append(None)
-            out_lats.append(None)
-        out_lons.append(lons[i])
-        out_lats.append(lats[i])
-    return out_lons, out_lats
-
-
-def dist_km(lon1, lat1, lon2, lat2) -> float:
-    _, _, d = _geod.inv(lon1, lat1, lon2, lat2)
-    return d / 1000
-
-
-def marker_size(count: int) -> int:
-    """Bucketed sizes to reduce visual inflation from transit counts."""
-    if count <= 5:   return 8
-    if count <= 10:  return 12
-    if count <= 15:  return 16
-    return 20
-
-
-# ── Data loading / stats ──────────────────────────────────────────────────────
-@st.cache_data(show_spinner=False)
-def load_routes(csv_bytes: bytes | None = None) -> list[tuple[str, str]]:
-    try:
-        src = io.BytesIO(csv_bytes) if csv_bytes else "data/my_flight_log.csv"
-        df  = pd.read_csv(src)
-        routes = []
-        for _, row in df.iterrows():
-            o = str(row.get("origin",      "")).strip().upper()
-            d = str(row.get("destination", "")).strip().upper()
-            if len(o) == 3 and len(d) == 3 and "NAN" not in (o, d):
-                routes.append((o, d))
-        return routes
-    except Exception as e:
-        st.error(f"Failed to load flight data: {e}")
-        return []
-
-
-def compute_stats(routes: list[tuple[str, str]]) -> dict:
-    all_ap   = [a for pair in routes for a in pair]
-    visits   = Counter(all_ap)
-    total_km = sum(
-        dist_km(*AIRPORTS[o][:2], *AIRPORTS[d][:2])
-        for o, d in routes if o in AIRPORTS and d in AIRPORTS
-    )
-    regions  = sorted({AIRPORTS[a][3] for a in all_ap if a in AIRPORTS})
-    missing  = sorted({a for o, d in routes for a in (o, d) if a not in AIRPORTS})
-    return dict(n_flights=len(routes), n_airports=len(visits),
-                total_km=total_km, n_regions=len(regions),
-                regions=regions, visits=visits, missing=missing)
+# ── Map modes ─────────────────────────────────────────────────────────────────
+MODES = {"🌐 Globe": "globe", "🗺️ Flat Map": "flat", "🛰️ Satellite": "satellite"}
 
+# ── Diagnostics ───────────────────────────────────────────────────────────────
+# FLIGHTMAP_DIAGNOSTICS=1 opens the panel by default; FLIGHTMAP_METRICS_LOG
+# appends every rerun's timings and counters to that file as JSON lines.
+DIAGNOSTICS_DEFAULT = os.environ.get("FLIGHTMAP_DIAGNOSTICS", "") not in ("", "0")
+METRICS_LOG         = os.environ.get("FLIGHTMAP_METRICS_LOG", "")
 
 # ── Sidebar ───────────────────────────────────────────────────────────────────
 with st.sidebar:
     st.title("✈️ Controls")
 
-    uploaded = st.file_uploader(
-        "Upload your flight log (CSV)", type="csv",
-        help="Two columns: `origin` and `destination` (IATA codes).",
+    uploads = st.file_uploader(
+        "Upload your flight logs (CSV)", type=["csv", "gz", "parquet"],
+        accept_multiple_files=True,
+        help="Two columns: `origin` and `destination` (IATA codes), plus an "
+             "optional `date`. Also accepts `.csv.gz` and `.parquet`. Several "
+             "files are merged, a dated flight found in more than one "
+             "counted once.",
     )
 
     st.divider()
@@ -214,16 +50,23 @@ with st.sidebar:
 
     mode = st.radio(
         "Mode",
-        ["🌐 Globe", "🗺️ Flat Map", "🛰️ Satellite"],
+        list(MODES),
         index=0, horizontal=True,
     )
 
+    sat_renderer = "Standard"
     if mode == "🌐 Globe":
         style_key = st.selectbox("Globe style", list(GLOBE_STYLES.keys()), index=0)
     elif mode == "🗺️ Flat Map":
         style_key = st.selectbox("Map style",   list(FLAT_STYLES.keys()),  index=0)
     else:
         style_key = None
+        sat_renderer = st.radio(
+            "Renderer", ["Standard", "High-volume (GPU)"], index=0, horizontal=True,
+            help="High-volume draws routes as native map layers on the GPU and "
+                 "stays responsive with 100k+ routes; hover a route's midpoint "
+                 "for its label.",
+        )
         st.caption(
             "Satellite imagery © Esri (free, no API key).  \n"
             "Initial view is Pacific-centered so routes across the ocean "
@@ -237,206 +80,246 @@ with st.sidebar:
     show_airports = st.checkbox("Airport markers",           value=True)
     show_labels   = st.checkbox("Airport IATA labels",       value=False)
     scale_width   = st.checkbox("Scale routes by frequency", value=True)
+    use_lod       = st.checkbox(
+        "Level of detail", value=True,
+        help="For large logs, draw only what the initial view can show: "
+             "simplified arcs, off-screen routes culled, rare nearby routes merged.",
+    )
 
     st.divider()
     st.subheader("📍 Initial View")
     # Globe & Flat use projection rotation; Satellite uses lat/lon center + zoom
-    region = st.radio("Focus on",
-                      ["Asia-Pacific", "North America", "Europe", "World"],
-                      index=0)
-
-# ── Presets ───────────────────────────────────────────────────────────────────
-# Globe / Flat: rotation center for Scattergeo projection
-GEO_ROTATION = {
-    "Asia-Pacific":  dict(lon=160, lat=15),
-    "North America": dict(lon=-95, lat=40),
-    "Europe":        dict(lon=15,  lat=50),
-    "World":         dict(lon=160, lat=15),   # Pacific-centric world view
-}
-# Satellite: Mapbox center + zoom
-# Asia-Pacific center is set near the antimeridian (lon=-175) so that
-# BOTH the Asian side (positive lons) and the American side (negative lons)
-# are inside the same viewport – eliminating the Pacific gap for Scattermapbox.
-SAT_VIEW = {
-    "Asia-Pacific":  dict(lat=25,  lon=-175, zoom=1.6),
-    "North America": dict(lat=40,  lon=-100, zoom=2.8),
-    "Europe":        dict(lat=50,  lon=10,   zoom=3.0),
-    "World":         dict(lat=15,  lon=-175, zoom=1.2),
-}
+    region = st.radio("Focus on", list(REGIONS), index=0)
 
-# ── Load data ─────────────────────────────────────────────────────────────────
-csv_bytes = uploaded.read() if uploaded else None
-routes    = load_routes(csv_bytes)
-stats     = compute_stats(routes) if routes else {}
+    st.divider()
+    show_diagnostics = st.checkbox(
+        "🛠 Diagnostics", value=DIAGNOSTICS_DEFAULT,
+        help="Per-stage timings, traces / points / bytes drawn and cache hit "
+             "rates for this rerun.",
+    )
 
-# ── Header metrics ────────────────────────────────────────────────────────────
 st.title("✈️ My Flight Route Map")
 st.caption("Interactive personal flight history — great-circle routes, Asia-Pacific focused.")
 
-if stats:
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Total Flights",    stats["n_flights"])
-    c2.metric("Airports Visited", stats["n_airports"])
-    c3.metric("Distance Flown",   f"{stats['total_km']:,.0f} km")
-    c4.metric("Regions",          stats["n_regions"])
+# ── Deferred imports ──────────────────────────────────────────────────────────
+# Everything above needs only Streamlit, so a cold start shows the sidebar and
+# header while the data and plotting stack loads.  Reruns find these modules
+# in sys.modules and pay nothing.
+with diag.imports("numpy"):
+    import numpy as np
+with diag.imports("pandas"):
+    import pandas as pd
+with diag.imports("plotly"):
+    import plotly.graph_objects as go
+with diag.imports("flightmap"):
+    from flightmap.airports import get_registry
+    from flightmap.cache import ArcCache, LogCache
+    from flightmap.figure import MAX_FRAMES, FigureCache, build_timeline_figure, route_digest
+    from flightmap.ingest import (
+        RouteTable, content_digest, read_many, read_routes, stream_route_counts,
+    )
+    from flightmap.network import RouteNetwork
+    from flightmap.routelog import RouteLog
+    from flightmap.stats import compute_stats, stats_from_route_counts
+    from flightmap.timeline import PERIODS, RouteTimeline
 
-# ── Build figure ──────────────────────────────────────────────────────────────
-route_color = COLOR_THEMES[color_key]
-fig         = go.Figure()
-normalized  = Counter(tuple(sorted(pair)) for pair in routes)
-
-
-def add_routes_geo(fig, normalized, route_color, scale_width):
-    """Add Scattergeo route traces (Globe or Flat mode)."""
-    for (o, d), cnt in normalized.items():
-        if o not in AIRPORTS or d not in AIRPORTS:
-            continue
-        lons, lats = great_circle_path(*AIRPORTS[o][:2], *AIRPORTS[d][:2])
-        width   = (1.5 + 0.7 * (cnt - 1)) if scale_width else 2.0
-        opacity = min(0.45 + 0.12 * cnt, 0.95) if scale_width else 0.65
-        fig.add_trace(go.Scattergeo(
-            lon=lons, lat=lats, mode="lines",
-            line=dict(width=width, color=route_color),
-            opacity=opacity,
-            hoverinfo="text",
-            text=f"✈ {o} → {d}" + (f"  ×{cnt}" if cnt > 1 else ""),
-            showlegend=False,
-        ))
+# ── Arc geometry cache ────────────────────────────────────────────────────────
+# Shared by every session; set FLIGHTMAP_ARC_CACHE="" to keep it in memory only.
+ARC_CACHE_PATH = os.environ.get("FLIGHTMAP_ARC_CACHE", ".cache/arcs.sqlite")
 
 
-def add_airports_geo(fig, stats, route_color, show_labels):
-    """Add Scattergeo airport markers."""
-    for airport, cnt in stats["visits"].items():
-        if airport not in AIRPORTS:
-            continue
-        lon, lat, name, _ = AIRPORTS[airport]
-        fig.add_trace(go.Scattergeo(
-            lon=[lon], lat=[lat],
-            mode="markers+text" if show_labels else "markers",
-            marker=dict(size=marker_size(cnt), color=route_color, opacity=0.85),
-            text=airport if show_labels else "",
-            textposition="top right",
-            textfont=dict(color="white", size=9),
-            hovertext=f"<b>{airport}</b> – {name}<br>Visited {cnt}×",
-            hoverinfo="text",
-            showlegend=False,
-        ))
+@st.cache_resource(show_spinner=False)
+def get_arc_cache() -> ArcCache:
+    return ArcCache(path=ARC_CACHE_PATH or None)
 
 
-def add_routes_mapbox(fig, normalized, route_color, scale_width):
-    """Add Scattermapbox route traces (Satellite mode)."""
-    for (o, d), cnt in normalized.items():
-        if o not in AIRPORTS or d not in AIRPORTS:
-            continue
-        lons, lats = great_circle_path(*AIRPORTS[o][:2], *AIRPORTS[d][:2])
-        width   = (1.5 + 0.7 * (cnt - 1)) if scale_width else 2.0
-        opacity = min(0.45 + 0.12 * cnt, 0.95) if scale_width else 0.65
-        fig.add_trace(go.Scattermapbox(
-            lon=lons, lat=lats, mode="lines",
-            line=dict(width=width, color=route_color),
-            opacity=opacity,
-            hoverinfo="text",
-            text=f"✈ {o} → {d}" + (f"  ×{cnt}" if cnt > 1 else ""),
-            showlegend=False,
-        ))
+# ── Figure cache ──────────────────────────────────────────────────────────────
+# Built maps, shared by every session; a color or theme change recolors the
+# cached figure instead of rebuilding its traces.
+@st.cache_resource(show_spinner=False)
+def get_figure_cache() -> FigureCache:
+    return FigureCache()
 
 
-def add_airports_mapbox(fig, stats, route_color, show_labels):
-    """Add Scattermapbox airport markers."""
-    for airport, cnt in stats["visits"].items():
-        if airport not in AIRPORTS:
-            continue
-        lon, lat, name, _ = AIRPORTS[airport]
-        fig.add_trace(go.Scattermapbox(
-            lon=[lon], lat=[lat],
-            mode="markers+text" if show_labels else "markers",
-            marker=dict(size=marker_size(cnt), color=route_color, opacity=0.85),
-            text=airport if show_labels else "",
-            textposition="top right",
-            textfont=dict(color="white", size=9),
-            hovertext=f"<b>{airport}</b> – {name}<br>Visited {cnt}×",
-            hoverinfo="text",
-            showlegend=False,
-        ))
+# ── Data loading ──────────────────────────────────────────────────────────────
+# Uploads above this size are streamed in chunks instead of loaded whole
+STREAM_THRESHOLD_MB = 50
 
 
-# ── Globe mode ────────────────────────────────────────────────────────────────
-if mode == "🌐 Globe":
-    gs  = GLOBE_STYLES[style_key]
-    rot = GEO_ROTATION[region]
-    add_routes_geo(fig, normalized, route_color, scale_width)
-    if show_airports and stats:
-        add_airports_geo(fig, stats, route_color, show_labels)
-    fig.update_layout(
-        geo=dict(
-            projection_type="orthographic",
-            projection_rotation=dict(lon=rot["lon"], lat=rot["lat"]),
-            showland=True,       landcolor=gs["land"],
-            showocean=True,      oceancolor=gs["ocean"],
-            showcountries=True,  countrycolor=gs["country"],
-            showcoastlines=True, coastlinecolor=gs["coast"],
-            showlakes=True,      lakecolor=gs["ocean"],
-            showframe=False,
-            bgcolor=gs["bg"],
-        ),
-        paper_bgcolor=gs["bg"],
-        margin=dict(r=0, t=0, l=0, b=0),
-        height=680, showlegend=False,
-    )
+@st.cache_data(show_spinner=False)
+def load_routes() -> RouteTable:
+    """The bundled sample log."""
+    try:
+        return read_routes("data/my_flight_log.csv")
+    except Exception as e:
+        st.error(f"Failed to load flight data: {e}")
+        return RouteTable.from_pairs([])
 
-# ── Flat Map mode ─────────────────────────────────────────────────────────────
-# Uses go.Scattergeo with natural-earth projection.
-# Rotating the projection to lon=160 makes it Pacific-centric.
-# Scattergeo handles the antimeridian internally → no Pacific gap.
-elif mode == "🗺️ Flat Map":
-    gs  = FLAT_STYLES[style_key]
-    rot = GEO_ROTATION[region]
-    add_routes_geo(fig, normalized, route_color, scale_width)
-    if show_airports and stats:
-        add_airports_geo(fig, stats, route_color, show_labels)
-    fig.update_layout(
-        geo=dict(
-            projection_type="natural earth",
-            projection_rotation=dict(lon=rot["lon"]),
-            showland=True,       landcolor=gs["land"],
-            showocean=True,      oceancolor=gs["ocean"],
-            showcountries=True,  countrycolor=gs["country"],
-            showcoastlines=True, coastlinecolor=gs["coast"],
-            showlakes=True,      lakecolor=gs["ocean"],
-            showframe=False,
-            bgcolor=gs["bg"],
-            lonaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.08)", dtick=30),
-            lataxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.08)", dtick=30),
-        ),
-        paper_bgcolor=gs["bg"],
-        margin=dict(r=0, t=0, l=0, b=0),
-        height=620, showlegend=False,
-    )
 
-# ── Satellite mode ────────────────────────────────────────────────────────────
-# Uses go.Scattermapbox with Esri World Imagery tiles (free, no API key).
-# Center is placed near lon=-175 (just east of the antimeridian) so that
-# positive-longitude (Asia) and negative-longitude (Americas) route segments
-# both fall inside the visible tile viewport, eliminating the Pacific gap.
-else:
-    sv = SAT_VIEW[region]
-    add_routes_mapbox(fig, normalized, route_color, scale_width)
-    if show_airports and stats:
-        add_airports_mapbox(fig, stats, route_color, show_labels)
-    fig.update_layout(
-        mapbox=dict(
-            style="white-bg",
-            zoom=sv["zoom"],
-            center=dict(lat=sv["lat"], lon=sv["lon"]),
-            layers=[{"below": "traces", "sourcetype": "raster",
-                     "source": [_ESRI_SAT]}],
-        ),
-        margin=dict(r=0, t=0, l=0, b=0),
-        height=680, showlegend=False,
-        paper_bgcolor="rgba(0,0,0,0)",
-    )
+@st.cache_resource(show_spinner=False)
+def get_log_cache() -> LogCache:
+    """Parsed uploads by content digest, shared by every session."""
+    return LogCache()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_uploads(digests: tuple, _files) -> tuple[RouteTable, dict]:
+    """Uploads parsed in parallel and merged; known files come from the log cache."""
+    return read_many([f.getvalue() for f in _files], cache=get_log_cache(),
+                     digests=digests)
+
+
+def upload_digests(files) -> tuple:
+    """Content digest per upload, hashed once per uploaded file."""
+    known = st.session_state.setdefault("upload_digests", {})
+    for f in files:
+        if f.file_id not in known:
+            known[f.file_id] = content_digest(f.getvalue())
+    return tuple(known[f.file_id] for f in files)
+
+
+def load_route_counts(files) -> Counter:
+    """
+    Stream large uploads in chunks; only route counts are kept.  Counts are
+    remembered per upload in the session, not in st.cache_data, since the
+    progress bar can't be replayed from a cache.  A file that fails to read
+    is reported and not remembered.
+    """
+    known = st.session_state.setdefault("streamed_counts", {})
+    for file_id in set(known) - {f.file_id for f in files}:
+        del known[file_id]          # no longer uploaded
+    total = Counter()
+    for f in files:
+        if f.file_id not in known:
+            bar = st.progress(0.0, text=f"Streaming {f.name}…")
+            try:
+                known[f.file_id] = stream_route_counts(
+                    f, progress=lambda x: bar.progress(x, text=f"Streaming {f.name}… {x:.0%}"))
+            except Exception as e:
+                st.error(f"Failed to load {f.name}: {e}")
+                continue
+            finally:
+                bar.empty()
+        total.update(known[f.file_id])
+    return total
+
+
+# ── Load data ─────────────────────────────────────────────────────────────────
+streamed = sum(f.size for f in uploads) > STREAM_THRESHOLD_MB * 1e6
+data_key = "default"
+with diag.stage("load data"):
+    if streamed:
+        data_key   = content_digest("".join(f.file_id for f in uploads).encode())
+        normalized = load_route_counts(uploads)
+        routes     = RouteTable.from_pairs([])   # per-flight rows are not kept
+        if len(uploads) > 1:
+            st.caption("Streamed uploads are merged without removing duplicate flights.")
+    elif uploads:
+        digests  = upload_digests(uploads)
+        data_key = content_digest("".join(digests).encode())
+        with st.spinner(f"Reading {len(uploads)} flight log(s)…"):
+            routes, report = load_uploads(digests, uploads)
+        normalized = routes.route_counts()
+        for i, msg in report["errors"].items():
+            st.error(f"Failed to load {uploads[i].name}: {msg}")
+        if report["files"] > 1:
+            merged = report["files"] - len(report["errors"])
+            st.caption(f"{merged} files merged ({report['cached']} unchanged, "
+                       f"{report['parsed']} parsed); {report['duplicates']:,} "
+                       f"duplicate flights dropped.")
+    else:
+        routes     = load_routes()
+        normalized = routes.route_counts()
+
+# ── Timeline ──────────────────────────────────────────────────────────────────
+# Logs with a `date` column get a date-range filter, per-period stats and a
+# period-by-period animation.  Cached per data source (and date range).
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_timeline(source: str, _routes: RouteTable) -> RouteTimeline:
+    return RouteTimeline(_routes)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_timeline_figure(data_key, freq, mode, style_key, color_key, region,
+                        show_airports, show_labels, _timeline, _stats):
+    return build_timeline_figure(_timeline, _stats, freq, mode, style_key, color_key,
+                                 region, show_airports, show_labels,
+                                 arc_cache=get_arc_cache())
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_period_stats(data_key: str, freq: str, _timeline: RouteTimeline) -> pd.DataFrame:
+    return _timeline.period_stats(freq)
+
+
+timeline = None
+animate  = False
+if not streamed and routes.time is not None and not np.isnat(routes.time).all():
+    with diag.stage("timeline"):
+        timeline = get_timeline(data_key, routes)
+    first, last = timeline.start.date(), timeline.end.date()
+    with st.sidebar:
+        st.divider()
+        st.subheader("🕒 Timeline")
+        dates = (st.slider("Dates", first, last, (first, last), format="YYYY-MM-DD")
+                 if first < last else (first, last))
+        period  = st.selectbox("Period", list(PERIODS), index=list(PERIODS).index("Month"))
+        animate = st.checkbox(
+            "▶ Animate by period", value=False,
+            help="Reveal routes period by period, each the first time it was flown.",
+        )
+    if dates != (first, last):
+        with diag.stage("timeline"):
+            timeline   = timeline.window(dates[0], dates[1] + pd.Timedelta(days=1))
+            routes     = timeline.routes
+            normalized = routes.route_counts()
+        data_key = f"{data_key}@{dates[0]}/{dates[1]}"
+    freq    = PERIODS[period]
+    animate = animate and len(timeline) > 0     # nothing to animate in an empty range
+    if animate and len(timeline.periods(freq)[0]) > MAX_FRAMES:
+        st.sidebar.caption(f"⚠️ More than {MAX_FRAMES} {period.lower()}s in range; "
+                           f"showing the static map. Pick a longer period or "
+                           f"fewer dates to animate.")
+        animate = False
+
+with diag.stage("stats"):
+    if streamed:
+        stats = stats_from_route_counts(normalized) if normalized else {}
+    else:
+        stats = compute_stats(routes) if len(routes) else {}
+
+# ── Header metrics ────────────────────────────────────────────────────────────
+if stats:
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Total Flights",    stats["n_flights"])
+    c2.metric("Airports Visited", stats["n_airports"])
+    c3.metric("Distance Flown",   f"{stats['total_km']:,.0f} km")
+    c4.metric("Regions",          stats["n_regions"])
+
+# ── Build figure ──────────────────────────────────────────────────────────────
+route_color = COLOR_THEMES[color_key]
+with diag.stage("build figure"):
+    if animate:
+        fig, lod = get_timeline_figure(data_key, freq, MODES[mode], style_key, color_key,
+                                       region, show_airports, show_labels,
+                                       timeline, stats), None
+    else:
+        fig, lod = get_figure_cache().build(
+            normalized, stats, MODES[mode], style_key, color_key, region,
+            show_airports, show_labels, scale_width, use_lod,
+            sat_renderer="gpu" if sat_renderer == "High-volume (GPU)" else "standard",
+            arc_cache=get_arc_cache(),
+        )
 
-st.plotly_chart(fig, use_container_width=True, config={"scrollZoom": True})
+with diag.stage("plotly_chart"):
+    st.plotly_chart(fig, use_container_width=True, config={"scrollZoom": True})
+diag.mark("first render")
+if lod:
+    st.caption(
+        f"Level of detail: {len(lod['routes']):,} of {len(normalized):,} routes drawn "
+        f"({lod['culled']:,} off-screen, {lod['merged']:,} merged, "
+        f"{lod['dropped']:,} too short); vertices every {lod['segment_km']:,.0f} km."
+    )
 
 # ── Fun statistics ────────────────────────────────────────────────────────────
 if stats:
@@ -455,8 +338,10 @@ if stats:
 
     with col_r:
         st.markdown("#### 🏆 Top Airports")
+        airports = get_registry()
         top    = stats["visits"].most_common(10)
-        labels = [f"{c}  {AIRPORTS[c][2]}" if c in AIRPORTS else c for c, _ in top]
+        labels = [f"{c}  {airports.name[airports.row(c)]}" if c in airports else c
+                  for c, _ in top]
         values = [v for _, v in top]
         bar = go.Figure(go.Bar(
             y=labels, x=values, orientation="h",
@@ -476,26 +361,180 @@ if stats:
         + " · ".join(stats["regions"])
     )
 
+    if timeline is not None and len(timeline):
+        st.markdown(f"#### 📅 By {period}")
+        with diag.stage("period stats"):
+            per = get_period_stats(data_key, freq, timeline)
+        labels = per.index.astype(str)
+        trend  = go.Figure([
+            go.Bar(x=labels, y=per["flights"], name="Flights",
+                   marker_color=route_color, opacity=0.85),
+            go.Scatter(x=labels, y=per["total_km"], name="Total km", yaxis="y2",
+                       mode="lines", line=dict(color="#888888", width=2)),
+        ])
+        trend.update_layout(
+            margin=dict(l=0, r=10, t=10, b=0), height=260,
+            yaxis=dict(title="Flights"),
+            yaxis2=dict(title="Total km", overlaying="y", side="right", showgrid=False),
+            legend=dict(orientation="h", y=1.1),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        )
+        st.plotly_chart(trend, use_container_width=True)
+        with st.expander(f"Per-{period.lower()} table"):
+            st.dataframe(per.set_axis(labels).rename(columns=lambda c: c.replace("_", " ").title())
+                         .style.format("{:,.0f}"), use_container_width=True)
+        if timeline.undated:
+            st.caption(f"{timeline.undated:,} flights without a date are not on the timeline.")
+
+# ── Route network ─────────────────────────────────────────────────────────────
+# The graph behind the map: hubs, connectivity per region and multi-hop
+# itineraries.  Built only when switched on, and cached per route set.
+NETWORK_HUB_MEASURES = {"Routes": "degree", "Flights": "flights",
+                        "Betweenness": "betweenness"}
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_network(digest: str, _normalized: Counter) -> RouteNetwork:
+    return RouteNetwork.from_route_counts(_normalized)
+
+
+st.subheader("🕸 Route Network")
+if st.toggle("Show route network", key="show_network") and normalized:
+    with diag.stage("route network"):
+        net = get_network(route_digest(normalized), normalized)
+        if not len(net):
+            st.info("No route joins two airports in the database, so there is "
+                    "no network to analyze.")
+        else:
+            airports = get_registry()
+            labels   = net.component_labels()
+            largest  = np.bincount(labels).max()
+
+            n1, n2, n3, n4 = st.columns(4)
+            n1.metric("Airports", f"{len(net):,}")
+            n2.metric("Routes", f"{net.n_edges:,}")
+            n3.metric("Connected groups", f"{np.unique(labels).size:,}")
+            n4.metric("Largest group", f"{largest / len(net):.0%}")
+
+            col_l, col_r = st.columns(2)
+            with col_l:
+                measure = st.radio("Rank hubs by", list(NETWORK_HUB_MEASURES), horizontal=True)
+                hubs    = net.hubs(10, NETWORK_HUB_MEASURES[measure])
+                rows    = airports.rows([c for c, _ in hubs])
+                st.dataframe(pd.DataFrame({
+                    "Airport": [c for c, _ in hubs],
+                    "Name":    np.where(rows >= 0, airports.name[rows], "—"),
+                    measure:   [f"{v:,.0f}" for _, v in hubs],
+                }), use_container_width=True, hide_index=True)
+                if measure == "Betweenness":
+                    st.caption("Shortest itineraries (fewest legs) passing through "
+                               "each airport; estimated from a sample on large networks.")
+            with col_r:
+                st.markdown("**Connectivity by region**")
+                st.dataframe(pd.DataFrame(net.region_summary()).rename(columns=str.title),
+                             use_container_width=True, hide_index=True)
+
+            st.markdown("**Shortest itinerary over flown routes**")
+            codes  = net.codes.tolist()
+            p1, p2 = st.columns(2)
+            src    = p1.selectbox("From", codes, index=0)
+            dst    = p2.selectbox("To", codes, index=len(codes) - 1)
+            path   = net.shortest_path(src, dst)
+            if path is None:
+                st.info(f"No chain of flown routes connects {src} and {dst}.")
+            else:
+                st.markdown(" → ".join(path["path"]))
+                st.caption(f"{path['km']:,.0f} km in {path['hops']} "
+                           f"leg{'s' if path['hops'] != 1 else ''}")
+
 # ── Full route log ────────────────────────────────────────────────────────────
-with st.expander("📋 Full Route Log"):
-    rows = []
-    for o, d in routes:
-        km_val = (dist_km(*AIRPORTS[o][:2], *AIRPORTS[d][:2])
-                  if o in AIRPORTS and d in AIRPORTS else None)
-        rows.append({
-            "Origin":        o,
-            "Origin Name":   AIRPORTS[o][2] if o in AIRPORTS else "—",
-            "Dest":          d,
-            "Dest Name":     AIRPORTS[d][2] if d in AIRPORTS else "—",
-            "Distance (km)": f"{km_val:,.0f}" if km_val else "—",
-        })
-    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+# Built only when switched on, and cached per data source; filtering and
+# sorting run on the integer columns, and only the visible page is formatted.
+ROUTE_LOG_PAGE_SIZES = [50, 100, 500]
+ROUTE_LOG_SORTS      = {"Log order": "flight", "Origin": "origin",
+                        "Destination": "destination", "Distance": "distance"}
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_route_log(source: str, _routes: RouteTable) -> RouteLog:
+    return RouteLog(_routes)
+
+
+st.subheader("📋 Full Route Log")
+if streamed:
+    st.caption("Per-flight rows are not kept for streamed uploads.")
+elif st.toggle("Show route log", key="show_route_log") and len(routes):
+    with diag.stage("route log"):
+        log = get_route_log(data_key, routes)
+        codes  = ["Any", *log.routes.codes]
+        max_km = int(np.nanmax(log.km)) + 1 if np.isfinite(log.km).any() else 1
+
+        f1, f2, f3 = st.columns([1, 1, 2])
+        origin = f1.selectbox("Origin", codes)
+        dest   = f2.selectbox("Destination", codes)
+        km_lo, km_hi = f3.slider("Distance (km)", 0, max_km, (0, max_km))
+        s1, s2, s3 = st.columns([2, 1, 1])
+        sort_by    = s1.selectbox("Sort by", list(ROUTE_LOG_SORTS))
+        descending = s2.toggle("Descending")
+        page_size  = s3.selectbox("Rows per page", ROUTE_LOG_PAGE_SIZES, index=1)
+
+        # A full slider range means no distance filter, so unknown airports stay
+        idx = log.query(origin=None if origin == "Any" else origin,
+                        dest=None if dest == "Any" else dest,
+                        min_km=km_lo if km_lo > 0 else None,
+                        max_km=km_hi if km_hi < max_km else None,
+                        sort=ROUTE_LOG_SORTS[sort_by], descending=descending)
+        n_pages = max(1, -(-idx.size // page_size))
+        page    = st.number_input(f"Page (of {n_pages:,})", 1, n_pages, 1) - 1
+        st.dataframe(log.page(idx, page, page_size),
+                     use_container_width=True, hide_index=True)
+        first = page * page_size
+        st.caption(f"Flights {min(first + 1, idx.size):,}–{min(first + page_size, idx.size):,} "
+                   f"of {idx.size:,} matching ({len(log):,} in log)")
 
 if stats.get("missing"):
     with st.expander(f"⚠️ {len(stats['missing'])} airport(s) not in database"):
-        st.write("Add them to the AIRPORTS dict in app.py:")
+        st.write("Add them to the AIRPORTS dict in flightmap/airports.py "
+                 "(or point $FLIGHTMAP_AIRPORTS at a full airport CSV):")
         st.code(", ".join(stats["missing"]))
 
+# ── Diagnostics ───────────────────────────────────────────────────────────────
+diag.mark("full run")
+st.session_state["diagnostics"] = diag.report()
+if show_diagnostics or METRICS_LOG:
+    # Serializing again just to measure it, so only when asked
+    diag.count("figure JSON bytes", len(fig.to_json()))
+    caches = {"Arc geometry": get_arc_cache().stats(),
+              "Figures":      get_figure_cache().stats(),
+              "Flight logs":  get_log_cache().stats()}
+
+if METRICS_LOG:
+    with open(METRICS_LOG, "a") as f:
+        f.write(json.dumps(dict(time=time.time(), mode=MODES[mode],
+                                routes=len(normalized), **diag.report(),
+                                caches=caches)) + "\n")
+
+if show_diagnostics:
+    first = diag.marks["first render"]
+    with st.expander(f"🛠 Diagnostics — first render {first:,.0f} ms "
+                     f"(cold-start target {FIRST_RENDER_TARGET_MS:,} ms)"):
+        col_l, col_r = st.columns([3, 2])
+        with col_l:
+            st.dataframe(pd.DataFrame(diag.report()["steps"]).rename(columns=str.title),
+                         use_container_width=True, hide_index=True)
+        with col_r:
+            st.dataframe(pd.Series(diag.counters, name="Total").map("{:,}".format),
+                         use_container_width=True)
+            st.dataframe(pd.DataFrame(caches).T.reindex(
+                             columns=["hit_rate", "hits", "disk_hits", "restyled",
+                                      "misses", "size"])
+                         .style.format({"hit_rate": "{:.0%}"}),
+                         use_container_width=True)
+        st.caption("Imports only cost time on a cold start. Cached loads skip "
+                   "parse / encode; cached figures skip everything under "
+                   "build figure.")
+
 # ── Footer ────────────────────────────────────────────────────────────────────
 st.divider()
 st.caption(
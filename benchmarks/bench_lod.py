@@ -0,0 +1,62 @@
+"""
+Benchmark: figure payload with and without level of detail.
+
+Builds the route layer for each map preset at growing route counts and
+reports routes drawn, vertices and figure-JSON size.
+
+Run:  python -m benchmarks.bench_lod [--sizes 10000 50000 200000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from benchmarks.bench_route_traces import synthetic_routes
+from flightmap.airports import AirportRegistry
+from flightmap.lod import apply_lod, flat_view, globe_view, mapbox_view
+from flightmap.render import add_routes_geo
+
+VIEWS = {
+    "globe Asia-Pacific":     globe_view(160, 15),
+    "flat World":             flat_view(),
+    "satellite N. America":   mapbox_view(40, -100, 2.8),
+}
+
+
+def measure(normalized, airports, lod) -> dict:
+    t0  = time.perf_counter()
+    fig = go.Figure()
+    add_routes_geo(fig, normalized, "#DC143C", True, airports=airports, lod=lod)
+    js  = fig.to_json()
+    return dict(secs=time.perf_counter() - t0,
+                routes=len(lod["routes"]) if lod else len(normalized),
+                verts=sum(np.size(t.lon) for t in fig.data),
+                json_mb=len(js) / 1e6)
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    p.add_argument("--no-baseline", action="store_true",
+                   help="skip the full-detail build")
+    args = p.parse_args()
+
+    print(f"{'routes':>8}  {'view':<22} {'drawn':>7} {'verts':>9} "
+          f"{'JSON MB':>8} {'secs':>6}")
+    for n in args.sizes:
+        table, normalized = synthetic_routes(n)
+        airports = AirportRegistry.from_mapping(table)
+        runs = [(name, lambda v=v: apply_lod(normalized, v, airports))
+                for name, v in VIEWS.items()]
+        if not args.no_baseline:
+            runs.insert(0, ("full detail", lambda: None))
+        for name, make in runs:
+            r = measure(normalized, airports, make())
+            print(f"{n:>8}  {name:<22} {r['routes']:>7} {r['verts']:>9} "
+                  f"{r['json_mb']:>8.1f} {r['secs']:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: route network build and queries.
+
+Builds a synthetic network of `--airports` airports spread over a few
+regions and `--routes` distinct hub-weighted routes, then times the
+network build, degree hubs, sampled betweenness, components per region
+and a batch of shortest-path queries between random airports.
+
+Run:  python -m benchmarks.bench_network [--airports 10000] [--routes 1000000]
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from flightmap.airports import AirportRegistry
+from flightmap.distance import DistanceService
+from flightmap.network import BETWEENNESS_SAMPLES, RouteNetwork
+
+REGIONS = ("Asia-Pacific", "Europe", "North America", "Other")
+
+
+def synthetic_network(n_airports: int, n_routes: int, seed: int = 0):
+    """(registry, route counts) with Zipf-weighted route endpoints."""
+    rng   = np.random.default_rng(seed)
+    codes = np.array([f"S{i:05d}" for i in range(n_airports)], dtype=object)
+    airports = AirportRegistry(codes, [""] * n_airports,
+                               rng.uniform(-180, 180, n_airports),
+                               rng.uniform(-60, 70, n_airports),
+                               codes, rng.choice(REGIONS, n_airports))
+    hub  = 1.0 / np.arange(1, n_airports + 1) ** 0.8
+    hub /= hub.sum()
+    keys = np.empty(0, dtype=np.int64)
+    while keys.size < n_routes:
+        need = 2 * (n_routes - keys.size)
+        a, b = rng.choice(n_airports, need, p=hub), rng.choice(n_airports, need, p=hub)
+        ok   = a != b
+        new  = np.minimum(a[ok], b[ok]) * n_airports + np.maximum(a[ok], b[ok])
+        keys = np.unique(np.concatenate([keys, new]))
+    keys = rng.permutation(keys)[:n_routes]
+    pairs = zip(codes[keys // n_airports].tolist(), codes[keys % n_airports].tolist())
+    flights = rng.pareto(1.5, n_routes).astype(np.int64) + 1
+    return airports, Counter(dict(zip(pairs, flights.tolist())))
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - t0) * 1e3
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--airports", type=int, default=10_000)
+    p.add_argument("--routes", type=int, default=1_000_000)
+    p.add_argument("--paths", type=int, default=100, help="shortest-path queries")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    airports, counts = synthetic_network(args.airports, args.routes, args.seed)
+    dist = DistanceService(airports)
+    dist.km(*np.array(list(counts), dtype=object).T)   # fill distances up front
+    net, ms = timed(lambda: RouteNetwork.from_route_counts(counts, airports, dist))
+    print(f"{len(net):,} airports, {net.n_edges:,} routes")
+    print(f"  {'build (CSR)':<34} {ms:10.1f} ms")
+
+    _, ms = timed(lambda: net.hubs(10, "degree"))
+    print(f"  {'hubs by degree':<34} {ms:10.1f} ms")
+    _, ms = timed(lambda: net.hubs(10, "flights"))
+    print(f"  {'hubs by flights':<34} {ms:10.1f} ms")
+    _, ms = timed(lambda: net._dependencies(0))
+    print(f"  {'betweenness, one source':<34} {ms:10.1f} ms")
+    _, ms = timed(lambda: net.hubs(10, "betweenness"))
+    print(f"  {f'hubs by betweenness ({BETWEENNESS_SAMPLES} sources)':<34} {ms:10.1f} ms")
+    summary, ms = timed(net.region_summary)
+    print(f"  {'components per region':<34} {ms:10.1f} ms")
+
+    rng   = np.random.default_rng(args.seed)
+    pairs = net.codes[rng.integers(0, len(net), (args.paths, 2))]
+    found, ms = timed(lambda: [net.shortest_path(a, b) for a, b in pairs])
+    hops  = [r["hops"] for r in found if r]
+    print(f"  {'shortest path, mean per query':<34} {ms / args.paths:10.2f} ms"
+          f"  ({len(hops)} reachable, {np.mean(hops) if hops else 0:.1f} legs avg)")
+    for row in summary:
+        print(f"    {row['region']:<14} {row['airports']:>7,} airports "
+              f"{row['components']:>5,} components, largest {row['largest']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark suite: ingest → stats → geometry → figure → figure JSON.
+
+Runs every pipeline stage, plus the whole pipeline end to end, on the
+synthetic logs in `benchmarks.synthetic` at each size, recording wall
+time (best of `--repeat`) and peak memory per stage.  Results are saved
+as JSON; `--compare` prints the ratio against an earlier results file.
+
+Peak memory comes from tracemalloc in a second, separate pass, so the
+tracing overhead does not skew the timings.  It counts Python and NumPy
+allocations; Arrow's own buffers (pyarrow CSV engine) are not included.
+
+Run:  python -m benchmarks.bench_pipeline [--sizes 1000 100000 10000000]
+          [--datasets random heavy_tailed transpacific] [--out results.json]
+          [--compare old.json]
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly
+
+from benchmarks.synthetic import GENERATORS, write_log
+from flightmap.airports import get_registry
+from flightmap.figure import build_figure
+from flightmap.geometry import great_circle_arcs
+from flightmap.ingest import read_routes
+from flightmap.stats import compute_stats
+
+WORKDIR = Path(".cache/bench")
+
+
+def measure(fn, memory: bool = True, repeat: int = 1) -> tuple:
+    """(result, best secs of `repeat` calls, peak MB or None) of `fn`."""
+    secs = float("inf")
+    for _ in range(repeat):
+        t0     = time.perf_counter()
+        result = fn()
+        secs   = min(secs, time.perf_counter() - t0)
+    peak = None
+    if memory:
+        del result
+        tracemalloc.start()
+        result = fn()
+        peak   = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result, secs, peak
+
+
+def known_coords(normalized, airports=None) -> tuple:
+    """Endpoint coordinate arrays of the routes with both airports known."""
+    airports = get_registry() if airports is None else airports
+    pairs    = np.array(list(normalized), dtype=object).reshape(-1, 2)
+    lon1, lat1 = airports.coords(pairs[:, 0])
+    lon2, lat2 = airports.coords(pairs[:, 1])
+    ok = ~(np.isnan(lon1) | np.isnan(lon2))
+    return lon1[ok], lat1[ok], lon2[ok], lat2[ok]
+
+
+def run_dataset(path: Path, memory: bool = True, repeat: int = 1) -> list[dict]:
+    """Time (and trace) each stage on one log, then the end-to-end run."""
+    rows = []
+
+    def stage(name, fn):
+        result, secs, peak = measure(fn, memory, repeat)
+        rows.append(dict(stage=name, secs=round(secs, 4),
+                         peak_mb=None if peak is None else round(peak, 1)))
+        return result
+
+    routes     = stage("ingest",       lambda: read_routes(path))
+    normalized = stage("route_counts", routes.route_counts)
+    stats      = stage("stats",        lambda: compute_stats(routes))
+    coords     = known_coords(normalized)
+    stage("geometry", lambda: great_circle_arcs(*coords))
+    fig, _     = stage("figure",       lambda: build_figure(normalized, stats))
+    payload    = stage("figure_json",  fig.to_json)
+    rows[-1]["json_mb"] = round(len(payload) / 2**20, 2)
+
+    def end_to_end():
+        r = read_routes(path)
+        return build_figure(r.route_counts(), compute_stats(r))[0].to_json()
+    stage("end_to_end", end_to_end)
+    for row in rows:
+        row.update(routes=len(normalized))
+    return rows
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return dict(
+        timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        commit=commit or None, python=platform.python_version(),
+        platform=platform.platform(), numpy=np.__version__,
+        pandas=pd.__version__, plotly=plotly.__version__,
+    )
+
+
+def compare(results: list[dict], baseline: list[dict]):
+    """Print new vs old seconds for every matching (dataset, rows, stage)."""
+    old = {(r["dataset"], r["rows"], r["stage"]): r for r in baseline}
+    print(f"\n{'dataset':<13} {'rows':>10} {'stage':<13} {'old s':>8} {'new s':>8} {'ratio':>6}")
+    for r in results:
+        prev = old.get((r["dataset"], r["rows"], r["stage"]))
+        if prev and prev["secs"]:
+            print(f"{r['dataset']:<13} {r['rows']:>10,} {r['stage']:<13} "
+                  f"{prev['secs']:>8.3f} {r['secs']:>8.3f} {r['secs'] / prev['secs']:>6.2f}")
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 10_000_000])
+    p.add_argument("--datasets", nargs="+", choices=list(GENERATORS),
+                   default=list(GENERATORS))
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--repeat", type=int, default=1, help="timed runs per stage (best kept)")
+    p.add_argument("--no-memory", action="store_true",
+                   help="skip the tracemalloc pass (halves the run time)")
+    p.add_argument("--out", default=None,
+                   help=f"results file (default {WORKDIR}/results-<time>.json)")
+    p.add_argument("--compare", default=None, help="earlier results file")
+    args = p.parse_args()
+
+    env     = environment()
+    results = []
+    # Warm-up so the first timed stage doesn't pay for lazy imports
+    warm = WORKDIR / f"random-1000-{args.seed}.csv"
+    if not warm.exists():
+        write_log(warm, *GENERATORS["random"](1_000, args.seed))
+    run_dataset(warm, memory=False)
+
+    print(f"{'dataset':<13} {'rows':>10} {'stage':<13} {'secs':>8} {'peak MB':>8}")
+    for name in args.datasets:
+        for n in args.sizes:
+            # Logs are generated once per (dataset, size, seed) and reused
+            path = WORKDIR / f"{name}-{n}-{args.seed}.csv"
+            if not path.exists():
+                write_log(path, *GENERATORS[name](n, args.seed))
+            for row in run_dataset(path, not args.no_memory, args.repeat):
+                row = dict(dataset=name, rows=n, **row)
+                results.append(row)
+                peak = "—" if row["peak_mb"] is None else f"{row['peak_mb']:.1f}"
+                print(f"{name:<13} {n:>10,} {row['stage']:<13} {row['secs']:>8.3f} {peak:>8}")
+
+    out = Path(args.out or WORKDIR / f"results-{env['timestamp'].replace(':', '')}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(dict(environment=env, results=results), indent=2))
+    print(f"\nSaved {out}")
+
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text())["results"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Benchmark: per-route traces and arcs (legacy) vs batched, bucketed route
+traces built from vectorized arcs.
+
+Reports figure build time, trace count and figure-JSON size for a synthetic
+set of distinct routes over a random airport table.
+
+Run:  python -m benchmarks.bench_route_traces [--sizes 100 10000 100000]
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+
+import plotly.graph_objects as go
+
+from flightmap.airports import AirportRegistry
+from flightmap.geometry import _geod
+from flightmap.render import add_routes_geo
+
+
+def synthetic_routes(n_routes: int, seed: int = 0):
+    """`n_routes` distinct city pairs with heavy-tailed frequencies."""
+    rng      = random.Random(seed)
+    n_ap     = max(16, int((2 * n_routes) ** 0.5) + 2)
+    airports = {f"A{i:05d}": (rng.uniform(-180, 180), rng.uniform(-60, 70),
+                              f"Airport {i}", "Synthetic")
+                for i in range(n_ap)}
+    codes    = list(airports)
+    pairs    = set()
+    while len(pairs) < n_routes:
+        o, d = rng.sample(codes, 2)
+        pairs.add(tuple(sorted((o, d))))
+    normalized = Counter({p: min(int(rng.paretovariate(1.5)), 40) for p in pairs})
+    return airports, normalized
+
+
+def legacy_great_circle_path(lon1, lat1, lon2, lat2, npts=100):
+    """The pre-vectorization arc builder: one Geod.npts call per route."""
+    if (lon1, lat1) == (lon2, lat2):
+        return [lon1], [lat1]
+    pts  = _geod().npts(lon1, lat1, lon2, lat2, npts)
+    lons = [lon1] + [p[0] for p in pts] + [lon2]
+    lats = [lat1] + [p[1] for p in pts] + [lat2]
+    out_lons, out_lats = [lons[0]], [lats[0]]
+    for i in range(1, len(lons)):
+        if abs(lons[i] - lons[i - 1]) > 180:
+            out_lons.append(None)
+            out_lats.append(None)
+        out_lons.append(lons[i])
+        out_lats.append(lats[i])
+    return out_lons, out_lats
+
+
+def legacy_add_routes_geo(fig, normalized, route_color, scale_width, airports):
+    """The pre-batching renderer: one Scattergeo trace per route."""
+    for (o, d), cnt in normalized.items():
+        lons, lats = legacy_great_circle_path(*airports[o][:2], *airports[d][:2])
+        width   = (1.5 + 0.7 * (cnt - 1)) if scale_width else 2.0
+        opacity = min(0.45 + 0.12 * cnt, 0.95) if scale_width else 0.65
+        fig.add_trace(go.Scattergeo(
+            lon=lons, lat=lats, mode="lines",
+            line=dict(width=width, color=route_color),
+            opacity=opacity,
+            hoverinfo="text",
+            text=f"✈ {o} → {d}" + (f"  ×{cnt}" if cnt > 1 else ""),
+            showlegend=False,
+        ))
+
+
+def measure(add_fn, airports, normalized) -> dict:
+    t0  = time.perf_counter()
+    fig = go.Figure()
+    add_fn(fig, normalized, "#DC143C", True, airports=airports)
+    t1  = time.perf_counter()
+    js  = fig.to_json()
+    t2  = time.perf_counter()
+    return dict(traces=len(fig.data), build_s=t1 - t0,
+                json_s=t2 - t1, json_mb=len(js) / 1e6)
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    p.add_argument("--legacy-max", type=int, default=100_000,
+                   help="skip the legacy renderer above this many routes")
+    args = p.parse_args()
+
+    print(f"{'routes':>8} {'renderer':>8} {'traces':>7} {'build s':>9} "
+          f"{'to_json s':>9} {'JSON MB':>8}")
+    for n in args.sizes:
+        airports, normalized = synthetic_routes(n)
+        runs = [("batched", add_routes_geo, AirportRegistry.from_mapping(airports))]
+        if n <= args.legacy_max:
+            runs.insert(0, ("legacy", legacy_add_routes_geo, airports))
+        for name, fn, table in runs:
+            r = measure(fn, table, normalized)
+            print(f"{n:>8} {name:>8} {r['traces']:>7} {r['build_s']:>9.2f} "
+                  f"{r['json_s']:>9.2f} {r['json_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: Satellite renderers, Standard vs High-volume (GPU).
+
+Reports traces, map layers, build time and figure-JSON size for the route
+and airport layers at 100k routes over 10k airports.
+
+Run:  python -m benchmarks.bench_satellite [--routes 100000] [--airports 10000]
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+
+import plotly.graph_objects as go
+
+from flightmap.airports import AirportRegistry
+from flightmap.lod import lod_segment_km, mapbox_view
+from flightmap.render import add_airports_mapbox, add_routes_mapbox, add_routes_mapbox_gl
+
+
+def synthetic_network(n_routes: int, n_airports: int, seed: int = 0):
+    rng   = random.Random(seed)
+    codes = [f"A{i:05d}" for i in range(n_airports)]
+    table = {c: (rng.uniform(-180, 180), rng.uniform(-60, 70), f"Airport {c}",
+                 "Synthetic") for c in codes}
+    pairs = set()
+    while len(pairs) < n_routes:
+        pairs.add(tuple(sorted(rng.sample(codes, 2))))
+    normalized = Counter({p: min(int(rng.paretovariate(1.5)), 40) for p in pairs})
+    visits = Counter()
+    for (a, b), n in normalized.items():
+        visits[a] += n
+        visits[b] += n
+    return AirportRegistry.from_mapping(table), normalized, dict(visits=visits)
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--routes",   type=int, default=100_000)
+    p.add_argument("--airports", type=int, default=10_000)
+    p.add_argument("--renderers", nargs="+", default=["standard", "gpu"],
+                   choices=["standard", "gpu"])
+    args = p.parse_args()
+
+    airports, normalized, stats = synthetic_network(args.routes, args.airports)
+    print(f"{'renderer':<10} {'traces':>7} {'layers':>7} {'build s':>8} {'JSON MB':>8}")
+    for name in args.renderers:
+        t0  = time.perf_counter()
+        fig = go.Figure()
+        if name == "standard":
+            layers = []
+            add_routes_mapbox(fig, normalized, "#DC143C", True, airports=airports)
+            add_airports_mapbox(fig, stats, "#DC143C", False, airports=airports)
+        else:
+            # as the app does: vertex spacing for the World preset
+            seg    = lod_segment_km(mapbox_view(15, -175, 1.2))
+            layers = add_routes_mapbox_gl(fig, normalized, "#DC143C", True,
+                                          airports=airports, lod=dict(segment_km=seg))
+            add_airports_mapbox(fig, stats, "#DC143C", False, airports=airports)
+        fig.update_layout(mapbox=dict(style="white-bg", layers=layers))
+        js = fig.to_json()
+        print(f"{name:<10} {len(fig.data):>7} {len(layers):>7} "
+              f"{time.perf_counter() - t0:>8.1f} {len(js) / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
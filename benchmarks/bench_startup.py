@@ -0,0 +1,63 @@
+"""
+Benchmark: cold-start time to first render of the default Globe view.
+
+Each run is a fresh Python process that imports Streamlit (already loaded
+in a real server) and executes app.py once, then reports the app's own
+startup timings: per-import and per-stage milliseconds and the
+"first render" milestone, checked against FIRST_RENDER_TARGET_MS.
+
+Run:  python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from flightmap.diagnostics import FIRST_RENDER_TARGET_MS
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+
+# Runs in the child process; prints the app's startup report as JSON
+_CHILD = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t  = time.perf_counter()
+at.run()
+report = at.session_state["diagnostics"]
+report["marks"]["script run (AppTest)"] = round((time.perf_counter() - t) * 1e3, 1)
+print(json.dumps(report))
+"""
+
+
+def cold_run() -> dict:
+    out = subprocess.run([sys.executable, "-c", _CHILD, str(APP)], cwd=APP.parent,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--runs", type=int, default=5)
+    args = p.parse_args()
+
+    reports = [cold_run() for _ in range(args.runs)]
+    print(f"median of {args.runs} cold starts")
+    for i, step in enumerate(reports[0]["steps"]):
+        ms = statistics.median(r["steps"][i]["ms"] for r in reports)
+        print(f"  {step['kind']:<6} {step['name']:<36} {ms:8.1f} ms")
+    for name in reports[0]["marks"]:
+        ms = statistics.median(r["marks"][name] for r in reports)
+        print(f"  {'mark':<6} {name:<36} {ms:8.1f} ms")
+
+    first = statistics.median(r["marks"]["first render"] for r in reports)
+    verdict = "OK" if first <= FIRST_RENDER_TARGET_MS else "OVER TARGET"
+    print(f"first render {first:,.0f} ms vs target {FIRST_RENDER_TARGET_MS:,} ms: {verdict}")
+    return 0 if first <= FIRST_RENDER_TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Benchmark: incremental StatsAggregator updates vs full compute_stats.
+
+Appends (and then retracts) small batches of flights to a large log and
+times each update against a full recompute.  Correctness is covered by
+tests/test_stats.py.
+
+Run:  python -m benchmarks.bench_stats [--flights 1000000] [--batch 100]
+"""
+
+import argparse
+import random
+import time
+
+from flightmap.airports import AIRPORTS
+from flightmap.ingest import RouteTable
+from flightmap.stats import StatsAggregator, compute_stats
+
+
+def synthetic_log(n_flights: int, seed: int = 0):
+    """Random flights over the built-in airports plus a few unknown codes."""
+    rng   = random.Random(seed)
+    codes = list(AIRPORTS) + ["ZZZ", "QQQ"]
+    return [tuple(rng.sample(codes, 2)) for _ in range(n_flights)]
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--flights", type=int, default=1_000_000)
+    p.add_argument("--batch",   type=int, default=100)
+    p.add_argument("--steps",   type=int, default=5)
+    args = p.parse_args()
+
+    log = synthetic_log(args.flights + args.batch * args.steps)
+    base, extra = log[:args.flights], log[args.flights:]
+
+    t0  = time.perf_counter()
+    agg = StatsAggregator().add(RouteTable.from_pairs(base))
+    print(f"seed {args.flights:,} flights: {time.perf_counter() - t0:.2f} s")
+
+    inc_s = full_s = 0.0
+    for step in range(args.steps):
+        batch = extra[step * args.batch:(step + 1) * args.batch]
+        t0 = time.perf_counter()
+        agg.add(batch)
+        inc_s += time.perf_counter() - t0
+        flights = base + extra[:(step + 1) * args.batch]
+        t0 = time.perf_counter()
+        compute_stats(RouteTable.from_pairs(flights))
+        full_s += time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    agg.remove(extra)
+    inc_s += time.perf_counter() - t0
+
+    n = args.steps + 1
+    print(f"{n} updates of ≤{args.batch * args.steps} flights: "
+          f"incremental {inc_s / n * 1000:.2f} ms/update, "
+          f"full recompute {full_s / args.steps * 1000:.0f} ms/update")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Synthetic flight logs for the benchmark suite.
+
+Each generator returns (origin, destination) code arrays of `n` flights
+drawn from an airport registry (the built-in AIRPORTS table by default),
+reproducible for a given seed.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from flightmap.airports import get_registry
+
+
+def random_pairs(n: int, seed: int = 0, airports=None):
+    """Uniformly random city pairs."""
+    codes = _codes(airports)
+    rng   = np.random.default_rng(seed)
+    o     = rng.integers(0, codes.size, n)
+    d     = (o + rng.integers(1, codes.size, n)) % codes.size   # never o == d
+    return codes[o], codes[d]
+
+
+def heavy_tailed(n: int, seed: int = 0, airports=None, pool: int = 50_000):
+    """
+    Hub-and-spoke traffic: Zipf-weighted airports and a Pareto-weighted
+    pool of routes, so a few routes carry most of the flights.
+    """
+    codes = _codes(airports)
+    rng   = np.random.default_rng(seed)
+    hub   = 1.0 / np.arange(1, codes.size + 1) ** 1.2
+    hub   = rng.permutation(hub / hub.sum())
+    o     = rng.choice(codes.size, pool, p=hub)
+    d     = (o + 1 + rng.choice(codes.size - 1, pool, p=_renorm(hub[1:]))) % codes.size
+    freq  = rng.pareto(1.2, pool) + 1
+    pick  = rng.choice(pool, n, p=freq / freq.sum())
+    return codes[o[pick]], codes[d[pick]]
+
+
+def transpacific(n: int, seed: int = 0, airports=None):
+    """
+    Asia/Oceania ↔ Americas flights: every arc crosses the Pacific and
+    most cross the antimeridian.
+    """
+    airports = get_registry() if airports is None else airports
+    codes = _codes(airports)
+    west  = codes[airports.lon >= 90]
+    east  = codes[airports.lon <= -60]
+    rng   = np.random.default_rng(seed)
+    a, b  = west[rng.integers(0, west.size, n)], east[rng.integers(0, east.size, n)]
+    flip  = rng.random(n) < 0.5
+    return np.where(flip, b, a), np.where(flip, a, b)
+
+
+GENERATORS = {
+    "random":       random_pairs,
+    "heavy_tailed": heavy_tailed,
+    "transpacific": transpacific,
+}
+
+
+def write_log(path, origin, dest) -> Path:
+    """Write a two-column flight log CSV; returns its path."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"origin": origin, "destination": dest}).to_csv(path, index=False)
+    return path
+
+
+def _codes(airports):
+    """Every airport's IATA code, or its ICAO code where it has none."""
+    airports = get_registry() if airports is None else airports
+    return np.where(airports.iata != "", airports.iata, airports.icao).astype(object)
+
+
+def _renorm(p):
+    return p / p.sum()
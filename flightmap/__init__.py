@@ -0,0 +1,3 @@
+"""
+Flight Route Map – Streamlit-free core shared by app.py and the benchmarks.
+"""
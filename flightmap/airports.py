@@ -0,0 +1,198 @@
+"""
+Airport database.
+
+`AIRPORTS` is the small built-in table (lon, lat, full name, region).
+`AirportRegistry` is the columnar store the app actually queries: NumPy
+columns with an O(1) code → row index and vectorized coordinate gather.
+It is built lazily by `get_registry()`, either from `AIRPORTS` or from an
+OurAirports-style CSV/Parquet file named by $FLIGHTMAP_AIRPORTS.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# 'region' kept for internal stats only – never shown on hover
+AIRPORTS: dict[str, tuple] = {
+    # Mainland China
+    "HGH": (120.4333,  30.2295, "Hangzhou Xiaoshan",         "East Asia"),
+    "PVG": (121.8052,  31.1443, "Shanghai Pudong",            "East Asia"),
+    "SHA": (121.3361,  31.1981, "Shanghai Hongqiao",          "East Asia"),
+    "PEK": (116.5975,  40.0801, "Beijing Capital",            "East Asia"),
+    "CAN": (113.2988,  23.3924, "Guangzhou Baiyun",           "East Asia"),
+    "SZX": (113.8107,  22.6393, "Shenzhen Bao'an",            "East Asia"),
+    "TAO": (120.3744,  36.2661, "Qingdao Liuting",            "East Asia"),
+    "WNZ": (120.8530,  27.9122, "Wenzhou Longwan",            "East Asia"),
+    # HK / Macau / Taiwan
+    "HKG": (113.9185,  22.3080, "Hong Kong Intl",             "East Asia"),
+    "MFM": (113.5925,  22.1496, "Macau Intl",                 "East Asia"),
+    "TPE": (121.2325,  25.0777, "Taipei Taoyuan",             "East Asia"),
+    # Southeast Asia
+    "SIN": (103.9894,   1.3644, "Singapore Changi",           "Southeast Asia"),
+    "KUL": (101.7098,   2.7456, "Kuala Lumpur Intl",          "Southeast Asia"),
+    "BKK": (100.7501,  13.6811, "Bangkok Suvarnabhumi",       "Southeast Asia"),
+    "BWN": (114.9283,   4.9442, "Bandar Seri Begawan",        "Southeast Asia"),
+    # Japan / Korea
+    "NRT": (140.3929,  35.7668, "Tokyo Narita",               "East Asia"),
+    "HND": (139.7814,  35.5494, "Tokyo Haneda",               "East Asia"),
+    "KIX": (135.2380,  34.4272, "Osaka Kansai",               "East Asia"),
+    "ICN": (126.4505,  37.4602, "Seoul Incheon",              "East Asia"),
+    # Central Asia
+    "ALA": ( 76.8844,  43.3521, "Almaty",                     "Central Asia"),
+    "NQZ": ( 71.4669,  51.0222, "Nur-Sultan (Astana)",        "Central Asia"),
+    # Australia
+    "SYD": (151.1772, -33.9461, "Sydney Kingsford Smith",     "Oceania"),
+    "BNE": (153.1094, -27.3842, "Brisbane",                   "Oceania"),
+    # Europe
+    "FRA": (  8.5706,  50.0333, "Frankfurt Main",             "Europe"),
+    "TXL": ( 13.2877,  52.5597, "Berlin Tegel",               "Europe"),
+    "LHR": ( -0.4543,  51.4700, "London Heathrow",            "Europe"),
+    # North America – West
+    "SFO": (-122.375,  37.6189, "San Francisco Intl",         "North America"),
+    "OAK": (-122.221,  37.7126, "Oakland Intl",               "North America"),
+    "SJC": (-121.929,  37.3627, "San Jose Mineta",            "North America"),
+    "LAX": (-118.408,  33.9416, "Los Angeles Intl",           "North America"),
+    "SAN": (-117.190,  32.7336, "San Diego Intl",             "North America"),
+    "SEA": (-122.309,  47.4502, "Seattle-Tacoma",             "North America"),
+    "PDX": (-122.598,  45.5898, "Portland Intl",              "North America"),
+    "BOI": (-116.223,  43.5644, "Boise Airport",              "North America"),
+    "LAS": (-115.152,  36.0833, "Las Vegas Harry Reid",       "North America"),
+    # North America – South / Central
+    "AUS": ( -97.670,  30.1945, "Austin-Bergstrom",           "North America"),
+    "DFW": ( -97.040,  32.8998, "Dallas Fort Worth",          "North America"),
+    "IAH": ( -95.341,  29.9844, "Houston George Bush",        "North America"),
+    "JAN": ( -90.076,  32.3112, "Jackson-Medgar Wiley Evers", "North America"),
+    "ABQ": (-106.609,  35.0496, "Albuquerque Sunport",        "North America"),
+    "MIA": ( -80.291,  25.7959, "Miami Intl",                 "North America"),
+    "ATL": ( -84.428,  33.6407, "Atlanta Hartsfield-Jackson", "North America"),
+    "GSP": ( -82.221,  34.8954, "Greenville-Spartanburg",     "North America"),
+    "CHS": ( -80.040,  32.8986, "Charleston Intl",            "North America"),
+    "CLT": ( -80.943,  35.2140, "Charlotte Douglas",          "North America"),
+    "BNA": ( -86.678,  36.1245, "Nashville Intl",             "North America"),
+    # North America – East
+    "BOS": ( -71.005,  42.3656, "Boston Logan",               "North America"),
+    "JFK": ( -73.778,  40.6413, "New York JFK",               "North America"),
+    "EWR": ( -74.175,  40.6895, "Newark Liberty",             "North America"),
+    "RDU": ( -78.788,  35.8776, "Raleigh-Durham",             "North America"),
+    "MSN": ( -89.338,  43.1399, "Madison Dane County",        "North America"),
+    "MKE": ( -87.897,  42.9481, "Milwaukee Mitchell",         "North America"),
+    "STL": ( -90.370,  38.7487, "St. Louis Lambert",          "North America"),
+    "MSP": ( -93.222,  44.8848, "Minneapolis-Saint Paul",     "North America"),
+    # Canada
+    "YVR": (-123.183,  49.1951, "Vancouver Intl",             "North America"),
+    "YYZ": ( -79.631,  43.6777, "Toronto Pearson",            "North America"),
+}
+
+
+# OurAirports 'continent' → region label used in stats
+CONTINENT_REGIONS = {
+    "AF": "Africa",  "AN": "Antarctica", "AS": "Asia",    "EU": "Europe",
+    "NA": "North America", "OC": "Oceania", "SA": "South America",
+}
+
+# When several rows share a code, the busiest airport type wins
+_TYPE_RANK = {"large_airport": 0, "medium_airport": 1, "small_airport": 2}
+
+
+class AirportRegistry:
+    """
+    Columnar airport table.
+
+    Rows are addressed by IATA code, falling back to ICAO; unknown codes
+    map to row -1 (and NaN coordinates) in the vectorized accessors.
+    """
+
+    def __init__(self, iata, icao, lon, lat, name, region):
+        self.iata = np.asarray(iata, dtype=str)
+        self.icao = np.asarray(icao, dtype=str)
+        self.lon  = np.asarray(lon, dtype=float)
+        self.lat  = np.asarray(lat, dtype=float)
+        self.name = np.asarray(name, dtype=object)
+        self.region_labels, self.region_code = np.unique(
+            np.asarray(region, dtype=str), return_inverse=True)
+        # Earlier rows win on duplicate codes; IATA shadows ICAO.
+        self._index = {c: i for i, c in reversed(list(enumerate(self.icao))) if c}
+        self._index.update(
+            {c: i for i, c in reversed(list(enumerate(self.iata))) if c})
+
+    @classmethod
+    def from_mapping(cls, airports: dict) -> "AirportRegistry":
+        """From an `AIRPORTS`-style {iata: (lon, lat, name, region)} dict."""
+        codes = list(airports)
+        lon, lat, name, region = zip(*airports.values()) if codes else ((),) * 4
+        return cls(codes, [""] * len(codes), lon, lat, name, region)
+
+    @classmethod
+    def from_file(cls, path) -> "AirportRegistry":
+        """
+        From an OurAirports `airports.csv` (or a Parquet file with the same
+        columns).  A `region` column, if present, overrides the continent.
+        """
+        path = str(path)
+        df = (pd.read_parquet(path) if path.endswith(".parquet")
+              else pd.read_csv(path, dtype=str, keep_default_na=False))
+        df = df[df.get("type", pd.Series("", index=df.index)) != "closed"]
+        df = df.assign(_rank=df.get("type", pd.Series("", index=df.index))
+                       .map(_TYPE_RANK).fillna(len(_TYPE_RANK)))
+        df = df.sort_values("_rank", kind="stable")
+
+        def col(name):
+            if name not in df:
+                return pd.Series("", index=df.index)
+            return df[name].fillna("").astype(str).str.strip().str.upper()
+
+        iata = col("iata_code").where(lambda s: s.str.len() == 3, "")
+        icao = col("icao_code")
+        for fallback in ("gps_code", "ident"):
+            icao = icao.where(icao != "", col(fallback))
+        icao = icao.where(icao.str.len() == 4, "")
+        region = (df["region"] if "region" in df
+                  else col("continent").map(CONTINENT_REGIONS).fillna("Other"))
+        return cls(iata, icao,
+                   pd.to_numeric(df["longitude_deg"], errors="coerce"),
+                   pd.to_numeric(df["latitude_deg"],  errors="coerce"),
+                   df["name"], region)
+
+    def __len__(self):
+        return self.lon.size
+
+    def __contains__(self, code) -> bool:
+        return code in self._index
+
+    def row(self, code: str) -> int:
+        return self._index.get(code, -1)
+
+    def rows(self, codes) -> np.ndarray:
+        """Row index of every code in `codes` (-1 where unknown)."""
+        codes = np.asarray(codes, dtype=object)
+        if codes.size == 0:
+            return np.empty(codes.shape, dtype=np.int64)
+        inv, uniq = pd.factorize(codes.ravel())
+        return np.array([self._index.get(c, -1) for c in uniq],
+                        dtype=np.int64)[inv].reshape(codes.shape)
+
+    def coords(self, codes) -> tuple[np.ndarray, np.ndarray]:
+        """(lon, lat) arrays for `codes`, NaN where unknown."""
+        r  = self.rows(codes)
+        ok = r >= 0
+        return (np.where(ok, self.lon[r], np.nan),
+                np.where(ok, self.lat[r], np.nan))
+
+    def canonical(self, code: str) -> str:
+        """IATA code for `code` (which may be ICAO); unknown codes pass through."""
+        r = self.row(code)
+        return str(self.iata[r]) if r >= 0 and self.iata[r] else code
+
+    def region_of(self, rows) -> np.ndarray:
+        return self.region_labels[self.region_code[rows]]
+
+
+@lru_cache(maxsize=None)
+def get_registry(path: str | None = None) -> AirportRegistry:
+    """Shared registry, loaded on first use."""
+    path = path or os.environ.get("FLIGHTMAP_AIRPORTS")
+    if path:
+        return AirportRegistry.from_file(path)
+    return AirportRegistry.from_mapping(AIRPORTS)
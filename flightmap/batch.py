@@ -0,0 +1,168 @@
+"""
+Headless batch renderer: one map per flight log in a directory.
+
+For every log it writes `<name>.json` (Plotly figure) and/or `<name>.html`
+plus `<name>.stats.json`, using the same `build_figure` as the app.  Logs
+are fanned out over a process pool; each worker loads the airport registry
+once and keeps its own in-memory arc cache, backed by an optional SQLite
+store that all workers share.
+
+Run:  python -m flightmap.batch LOG_DIR OUT_DIR [--mode globe] [--format json html]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .airports import get_registry
+from .cache import ArcCache
+from .figure import build_figure
+from .ingest import read_routes
+from .stats import compute_stats
+from .styles import COLOR_THEMES, GLOBE_STYLES, MODES, REGIONS
+
+LOG_SUFFIXES = (".csv", ".csv.gz", ".parquet")
+FORMATS      = ("json", "html")
+
+# Per-worker state, set by _init_worker
+_AIRPORTS  = None
+_ARC_CACHE = None
+
+
+def find_logs(log_dir) -> list[Path]:
+    """Flight logs directly inside `log_dir`, sorted by name."""
+    return sorted(p for p in Path(log_dir).iterdir()
+                  if p.is_file() and p.name.lower().endswith(LOG_SUFFIXES))
+
+
+def log_name(path) -> str:
+    """File name without its log suffix (`trip.csv.gz` → `trip`)."""
+    name = Path(path).name
+    for suffix in sorted(LOG_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def render_log(path, out_dir, formats=("json",), airports=None, arc_cache=None,
+               **figure_kw) -> dict:
+    """
+    Render one log into `out_dir`; returns a summary row.
+
+    `figure_kw` is passed through to `build_figure`.
+    """
+    airports   = get_registry() if airports is None else airports
+    t0         = time.perf_counter()
+    routes     = read_routes(path, airports)
+    stats      = compute_stats(routes, airports) if len(routes) else {}
+    fig, _     = build_figure(routes.route_counts(), stats, airports=airports,
+                              arc_cache=arc_cache, **figure_kw)
+    out        = Path(out_dir) / log_name(path)
+    if "json" in formats:
+        fig.write_json(f"{out}.json")
+    if "html" in formats:
+        fig.write_html(f"{out}.html", include_plotlyjs="cdn",
+                       config={"scrollZoom": True})
+    with open(f"{out}.stats.json", "w") as f:
+        json.dump(stats, f, indent=2)
+    return dict(log=Path(path).name, flights=len(routes),
+                seconds=time.perf_counter() - t0)
+
+
+def _init_worker(airports_path, arc_cache_path):
+    global _AIRPORTS, _ARC_CACHE
+    _AIRPORTS  = get_registry(airports_path)
+    _ARC_CACHE = ArcCache(path=arc_cache_path)
+
+
+def _render_in_worker(path, out_dir, formats, figure_kw) -> dict:
+    return render_log(path, out_dir, formats, _AIRPORTS, _ARC_CACHE, **figure_kw)
+
+
+def render_all(logs, out_dir, formats=("json",), workers=None, airports_path=None,
+               arc_cache_path=None, **figure_kw):
+    """
+    Render `logs` over a pool of `workers` processes.
+
+    Yields one summary row per log as it finishes, in completion order; a
+    failed log yields a row with an `error` message instead of stopping
+    the batch.
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(airports_path, arc_cache_path)) as pool:
+        futures = {pool.submit(_render_in_worker, path, out_dir, formats, figure_kw): path
+                   for path in logs}
+        for fut in as_completed(futures):
+            try:
+                yield fut.result()
+            except Exception as e:
+                yield dict(log=futures[fut].name, error=f"{type(e).__name__}: {e}")
+
+
+def _choice(options, name: str) -> str:
+    """Match `name` against option keys, ignoring case and emoji prefixes."""
+    for key in options:
+        if name.lower() in (key.lower(), key.split(" ", 1)[-1].lower()):
+            return key
+    raise argparse.ArgumentTypeError(
+        f"{name!r} is not one of: {', '.join(k.split(' ', 1)[-1] for k in options)}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m flightmap.batch",
+                                 description=__doc__.split("\n\n")[0])
+    ap.add_argument("log_dir")
+    ap.add_argument("out_dir")
+    ap.add_argument("--mode", choices=MODES, default="globe")
+    ap.add_argument("--style", type=lambda s: _choice(GLOBE_STYLES, s),
+                    default="Natural", help="globe/flat theme, e.g. Dark")
+    ap.add_argument("--color", type=lambda s: _choice(COLOR_THEMES, s),
+                    default="Crimson Red", help="route color, e.g. 'Royal Blue'")
+    ap.add_argument("--region", type=lambda s: _choice(REGIONS, s), default="Asia-Pacific")
+    ap.add_argument("--format", nargs="+", choices=FORMATS, default=["json"],
+                    dest="formats")
+    ap.add_argument("--labels", action="store_true", help="show airport IATA labels")
+    ap.add_argument("--no-airports", action="store_true")
+    ap.add_argument("--no-lod", action="store_true")
+    ap.add_argument("--gpu", action="store_true",
+                    help="high-volume Satellite renderer")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--airports", default=None,
+                    help="OurAirports CSV/Parquet (default: $FLIGHTMAP_AIRPORTS)")
+    ap.add_argument("--arc-cache", default=".cache/arcs.sqlite",
+                    help="shared SQLite arc store; '' for memory only")
+    args = ap.parse_args(argv)
+
+    logs = find_logs(args.log_dir)
+    if not logs:
+        print(f"No {'/'.join(LOG_SUFFIXES)} logs in {args.log_dir}", file=sys.stderr)
+        return 1
+
+    print(f"Rendering {len(logs)} logs with {args.workers} workers → {args.out_dir}")
+    t0, failed = time.perf_counter(), 0
+    rows = render_all(
+        logs, args.out_dir, args.formats, args.workers, args.airports,
+        args.arc_cache or None, mode=args.mode, style_key=args.style,
+        color_key=args.color, region=args.region,
+        show_airports=not args.no_airports, show_labels=args.labels,
+        use_lod=not args.no_lod, sat_renderer="gpu" if args.gpu else "standard")
+    for i, row in enumerate(rows, 1):
+        if "error" in row:
+            failed += 1
+            print(f"[{i}/{len(logs)}] {row['log']}: FAILED {row['error']}", file=sys.stderr)
+        else:
+            print(f"[{i}/{len(logs)}] {row['log']}: {row['flights']:,} flights "
+                  f"in {row['seconds']:.2f} s")
+    secs = time.perf_counter() - t0
+    print(f"Done: {len(logs) - failed}/{len(logs)} logs in {secs:.1f} s "
+          f"({len(logs) / secs:.1f} logs/sec)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
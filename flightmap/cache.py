@@ -0,0 +1,213 @@
+"""
+Content-addressed caches.
+
+`ArcCache` holds arc geometry keyed by endpoint coordinates and point
+density, so the key changes whenever the geometry would.  Entries live in
+a bounded in-memory LRU and, if a path is given, in a SQLite file that
+survives restarts.
+
+`LogCache` holds parsed flight logs keyed by a digest of the file's bytes,
+so an unchanged file isn't parsed again while it is cached; it is bounded
+by both table count and column bytes.
+"""
+
+import hashlib
+import sqlite3
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .geometry import ARC_SEGMENT_KM, MAX_NPTS, great_circle_arcs
+
+# Part of every on-disk key; bump whenever `great_circle_arcs` output
+# changes, so arcs stored by an older version are never read back
+ARC_FORMAT = 2
+
+
+class ArcCache:
+    """
+    Drop-in for `great_circle_arcs` that only computes arcs it hasn't seen.
+
+    `maxsize` bounds the number of arcs held in memory; the on-disk store
+    (optional) is unbounded and is consulted before computing.
+    """
+
+    def __init__(self, maxsize: int = 50_000, path: str | Path | None = None,
+                 segment_km: float = ARC_SEGMENT_KM, max_npts: int = MAX_NPTS):
+        self.maxsize    = maxsize
+        self.segment_km = segment_km
+        self.max_npts   = max_npts
+        self.hits = self.disk_hits = self.misses = 0
+        self._mem  = OrderedDict()
+        self._lock = threading.Lock()
+        self._db   = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            # WAL + a busy timeout let several processes share one store
+            self._db = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS arcs ("
+                             "key TEXT PRIMARY KEY, lons BLOB, lats BLOB)")
+
+    def __len__(self):
+        return len(self._mem)
+
+    def _key(self, lon1, lat1, lon2, lat2, segment_km):
+        return (lon1, lat1, lon2, lat2, segment_km, self.max_npts)
+
+    @staticmethod
+    def _digest(key) -> str:
+        return hashlib.blake2b(struct.pack("6dI", *key, ARC_FORMAT),
+                               digest_size=16).hexdigest()
+
+    def _put(self, key, arc):
+        self._mem[key] = arc
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def _load(self, keys) -> dict:
+        """Fetch `keys` from the on-disk store, in chunks under SQLite's
+        bound-parameter limit."""
+        by_digest = {self._digest(k): k for k in keys}
+        digests, found = list(by_digest), {}
+        for i in range(0, len(digests), 500):
+            chunk = digests[i:i + 500]
+            rows  = self._db.execute(
+                f"SELECT key, lons, lats FROM arcs WHERE key IN "
+                f"({','.join('?' * len(chunk))})", chunk)
+            for digest, lons, lats in rows:
+                found[by_digest[digest]] = (np.frombuffer(lons, dtype=float),
+                                            np.frombuffer(lats, dtype=float))
+        return found
+
+    def _store(self, items):
+        self._db.executemany(
+            "INSERT OR IGNORE INTO arcs VALUES (?, ?, ?)",
+            [(self._digest(k), lons.tobytes(), lats.tobytes())
+             for k, (lons, lats) in items])
+        self._db.commit()
+
+    def arcs(self, lon1, lat1, lon2, lat2, segment_km=None):
+        """Same contract as `great_circle_arcs` (adaptive density)."""
+        segment_km = self.segment_km if segment_km is None else segment_km
+        coords = np.column_stack([np.asarray(a, dtype=float).ravel()
+                                  for a in (lon1, lat1, lon2, lat2)])
+        keys   = [self._key(*row, segment_km) for row in coords.tolist()]
+        with self._lock:
+            pieces = [self._mem.get(k) for k in keys]
+            for k, p in zip(keys, pieces):
+                if p is not None:
+                    self._mem.move_to_end(k)
+            miss = [i for i, p in enumerate(pieces) if p is None]
+            self.hits += len(keys) - len(miss)
+
+            if miss and self._db is not None:
+                found = self._load({keys[i] for i in miss})
+                self.disk_hits += sum(keys[i] in found for i in miss)
+                for i in miss:
+                    pieces[i] = found.get(keys[i])
+                miss = [i for i in miss if pieces[i] is None]
+
+            if miss:
+                self.misses += len(miss)
+                new = _split_arcs(*great_circle_arcs(
+                    *coords[miss].T, segment_km=segment_km,
+                    max_npts=self.max_npts), len(miss))
+                for i, arc in zip(miss, new):
+                    pieces[i] = arc
+                if self._db is not None:
+                    self._store({keys[i]: pieces[i] for i in miss}.items())
+
+            for k, p in zip(keys, pieces):
+                self._put(k, p)
+        return _join_arcs(pieces)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return dict(size=len(self._mem), hits=self.hits,
+                    disk_hits=self.disk_hits, misses=self.misses,
+                    hit_rate=(self.hits + self.disk_hits) / lookups if lookups else 0.0)
+
+
+def _split_arcs(lons, lats, arc, n):
+    """Cut `great_circle_arcs` output back into one (lons, lats) per route."""
+    idx   = np.flatnonzero(arc >= 0)
+    owner = arc[idx]
+    first = idx[np.searchsorted(owner, np.arange(n))]
+    last  = idx[np.searchsorted(owner, np.arange(n), side="right") - 1]
+    return [(lons[a:b + 1].copy(), lats[a:b + 1].copy())
+            for a, b in zip(first, last)]
+
+
+def _join_arcs(pieces):
+    """Inverse of `_split_arcs`: NaN-separated arrays plus route index."""
+    if not pieces:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+    sep  = np.array([np.nan])
+    lons = np.concatenate([x for p in pieces for x in (p[0], sep)][:-1])
+    lats = np.concatenate([y for p in pieces for y in (p[1], sep)][:-1])
+    lens = np.array([p[0].size + 1 for p in pieces])
+    arc  = np.repeat(np.arange(len(pieces)), lens)[:-1]
+    arc[np.isnan(lons)] = -1
+    return lons, lats, arc
+
+
+class LogCache:
+    """
+    Bounded LRU of parsed `RouteTable`s by content digest.
+
+    `maxsize` bounds the number of tables and `max_bytes` the size of their
+    columns; the least recently used go first.
+    """
+
+    def __init__(self, maxsize: int = 64, max_bytes: int = 512 * 2**20):
+        self.maxsize   = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes    = 0
+        self.hits = self.misses = 0
+        self._tables = OrderedDict()    # digest → (table, nbytes)
+        self._lock   = threading.Lock()
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __contains__(self, digest) -> bool:
+        return digest in self._tables
+
+    def get(self, digest):
+        """The table parsed from `digest`'s bytes, or None."""
+        with self._lock:
+            entry = self._tables.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._tables.move_to_end(digest)
+            return entry[0]
+
+    def put(self, digest, table):
+        nbytes = _table_nbytes(table)
+        with self._lock:
+            old = self._tables.pop(digest, None)
+            self.nbytes += nbytes - (old[1] if old else 0)
+            self._tables[digest] = (table, nbytes)
+            while self._tables and (len(self._tables) > self.maxsize
+                                    or self.nbytes > self.max_bytes):
+                self.nbytes -= self._tables.popitem(last=False)[1][1]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return dict(size=len(self._tables), nbytes=self.nbytes, hits=self.hits,
+                    misses=self.misses, hit_rate=self.hits / lookups if lookups else 0.0)
+
+
+def _table_nbytes(table) -> int:
+    """Approximate size of a `RouteTable`: its id and time columns plus codes."""
+    n = table.origin.nbytes + table.dest.nbytes + sum(map(len, table.codes.tolist()))
+    if table.time is not None:
+        n += table.time.nbytes
+    return n + 64 * table.codes.size      # per-string object overhead
@@ -0,0 +1,106 @@
+"""
+Per-run timings and counters.
+
+A `Diagnostics` records wall-clock milliseconds for named imports and
+stages of one script run, counters such as traces or points emitted, and
+milestones measured from its creation such as time to first render.
+Stages nest: time spent in a stage opened inside another is reported
+under "outer / inner", and repeated stages accumulate.
+
+Library hot paths report through the module-level `stage` and `count`,
+which go to the recorder whose stage is open around them and do nothing
+when there is none.  The current recorder and its open stages are a
+context variable, so concurrent app sessions (one thread each) don't mix,
+and work handed to a pool under `contextvars.copy_context().run` reports
+into the stage that submitted it, its times summed over the workers.
+
+Standard library only, so it can be imported before anything heavy.
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Time-to-first-render budget for the default Globe view on a cold start,
+# measured by benchmarks/bench_startup.py
+FIRST_RENDER_TARGET_MS = 1_500
+
+# (recorder, names of its open stages) for the running code
+_CURRENT = ContextVar("flightmap_diagnostics", default=None)
+
+
+class Diagnostics:
+    """Milliseconds per import and stage, plus counters, of one run."""
+
+    def __init__(self):
+        self.t0       = time.perf_counter()
+        self.steps    = {}    # (kind, "outer / inner") → [ms, calls], in run order
+        self.counters = {}    # name → total
+        self.marks    = {}    # milestone → ms since t0
+        self._lock    = threading.Lock()
+
+    @contextmanager
+    def _step(self, kind: str, name: str):
+        current = _CURRENT.get()
+        path    = (current[1] if current is not None and current[0] is self else ()) + (name,)
+        with self._lock:
+            step = self.steps.setdefault((kind, " / ".join(path)), [0.0, 0])
+        token = _CURRENT.set((self, path))
+        t     = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t) * 1e3
+            with self._lock:
+                step[0] += ms
+                step[1] += 1
+            _CURRENT.reset(token)
+
+    def imports(self, name: str):
+        """Context manager timing an import block."""
+        return self._step("import", name)
+
+    def stage(self, name: str):
+        """Context manager timing a stage of the run."""
+        return self._step("stage", name)
+
+    def count(self, name: str, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def mark(self, name: str) -> float:
+        """Record a milestone; returns ms since the recorder started."""
+        self.marks[name] = (time.perf_counter() - self.t0) * 1e3
+        return self.marks[name]
+
+    def report(self) -> dict:
+        """Steps, counters and milestones as plain data, rounded to 0.1 ms."""
+        return dict(
+            steps=[dict(kind=k, name=n, ms=round(ms, 1), calls=calls)
+                   for (k, n), (ms, calls) in self.steps.items()],
+            counters=dict(self.counters),
+            marks={n: round(ms, 1) for n, ms in self.marks.items()},
+            target_ms=FIRST_RENDER_TARGET_MS,
+        )
+
+    def summary(self) -> str:
+        """One line per step, counter and milestone, for logs."""
+        lines  = [f"  {k:<6} {n:<36} {ms:8.1f} ms"
+                  for (k, n), (ms, _) in self.steps.items()]
+        lines += [f"  {'count':<6} {n:<36} {v:>11,}" for n, v in self.counters.items()]
+        lines += [f"  {'mark':<6} {n:<36} {ms:8.1f} ms" for n, ms in self.marks.items()]
+        return "Diagnostics:\n" + "\n".join(lines)
+
+
+def stage(name: str):
+    """Time a stage on the current recorder, if any."""
+    current = _CURRENT.get()
+    return current[0].stage(name) if current is not None else nullcontext()
+
+
+def count(name: str, n=1):
+    """Add to a counter on the current recorder, if any."""
+    current = _CURRENT.get()
+    if current is not None:
+        current[0].count(name, n)
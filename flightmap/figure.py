@@ -0,0 +1,352 @@
+"""
+Whole-map figure assembly: the Globe / Flat / Satellite layouts.
+
+`build_figure` has no Streamlit dependency, so the app and the headless
+batch renderer (`flightmap.batch`) draw identical maps.  `FigureCache`
+memoizes it across reruns and sessions.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from . import diagnostics
+from .airports import get_registry
+from .lod import apply_lod, flat_view, globe_view, lod_segment_km, mapbox_view
+from .render import (
+    add_airports_geo, add_airports_mapbox, add_routes_geo, add_routes_mapbox,
+    add_routes_mapbox_gl, route_batches,
+)
+from .styles import (
+    COLOR_THEMES, ESRI_SAT, FLAT_STYLES, GEO_ROTATION, GLOBE_STYLES, MODES, SAT_VIEW,
+)
+
+# Level of detail kicks in above this many distinct routes
+LOD_MIN_ROUTES = 2_000
+
+# Timeline animation: frame cap (every frame sets every period trace),
+# frame duration, and the opacity of routes from earlier periods
+MAX_FRAMES    = 120
+FRAME_MS      = 600
+PAST_OPACITY  = 0.35
+
+
+def build_figure(normalized, stats, mode="globe", style_key="🌿 Natural",
+                 color_key="Crimson Red", region="Asia-Pacific",
+                 show_airports=True, show_labels=False, scale_width=True,
+                 use_lod=True, sat_renderer="standard", arc_cache=None,
+                 airports=None):
+    """
+    Draw the route map; returns (figure, lod).
+
+    `mode` is one of MODES, `style_key` a GLOBE_STYLES key (ignored in
+    Satellite mode) and `color_key` a COLOR_THEMES key.  `sat_renderer`
+    "gpu" draws Satellite routes as map layers.  `lod` is the `apply_lod`
+    result, or None when every route was drawn as-is.
+    """
+    route_color = COLOR_THEMES[color_key]
+    fig         = go.Figure()
+    lod_on      = use_lod and len(normalized) > LOD_MIN_ROUTES
+    lod         = None
+
+    # ── Globe mode ────────────────────────────────────────────────────────────
+    if mode == "globe":
+        gs  = GLOBE_STYLES[style_key]
+        rot = GEO_ROTATION[region]
+        if lod_on:
+            with diagnostics.stage("lod"):
+                lod = apply_lod(normalized, globe_view(rot["lon"], rot["lat"]), airports)
+        add_routes_geo(fig, normalized, route_color, scale_width, airports,
+                       arc_cache=arc_cache, lod=lod)
+        if show_airports and stats:
+            add_airports_geo(fig, stats, route_color, show_labels, airports)
+        fig.update_layout(
+            geo=dict(
+                projection_type="orthographic",
+                projection_rotation=dict(lon=rot["lon"], lat=rot["lat"]),
+                showland=True,       landcolor=gs["land"],
+                showocean=True,      oceancolor=gs["ocean"],
+                showcountries=True,  countrycolor=gs["country"],
+                showcoastlines=True, coastlinecolor=gs["coast"],
+                showlakes=True,      lakecolor=gs["ocean"],
+                showframe=False,
+                bgcolor=gs["bg"],
+            ),
+            paper_bgcolor=gs["bg"],
+            margin=dict(r=0, t=0, l=0, b=0),
+            height=680, showlegend=False,
+        )
+
+    # ── Flat Map mode ─────────────────────────────────────────────────────────
+    # Uses go.Scattergeo with natural-earth projection.
+    # Rotating the projection to lon=160 makes it Pacific-centric.
+    # Scattergeo handles the antimeridian internally → no Pacific gap.
+    elif mode == "flat":
+        gs  = FLAT_STYLES[style_key]
+        rot = GEO_ROTATION[region]
+        if lod_on:
+            with diagnostics.stage("lod"):
+                lod = apply_lod(normalized, flat_view(), airports)
+        add_routes_geo(fig, normalized, route_color, scale_width, airports,
+                       arc_cache=arc_cache, lod=lod)
+        if show_airports and stats:
+            add_airports_geo(fig, stats, route_color, show_labels, airports)
+        fig.update_layout(
+            geo=dict(
+                projection_type="natural earth",
+                projection_rotation=dict(lon=rot["lon"]),
+                showland=True,       landcolor=gs["land"],
+                showocean=True,      oceancolor=gs["ocean"],
+                showcountries=True,  countrycolor=gs["country"],
+                showcoastlines=True, coastlinecolor=gs["coast"],
+                showlakes=True,      lakecolor=gs["ocean"],
+                showframe=False,
+                bgcolor=gs["bg"],
+                lonaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.08)", dtick=30),
+                lataxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.08)", dtick=30),
+            ),
+            paper_bgcolor=gs["bg"],
+            margin=dict(r=0, t=0, l=0, b=0),
+            height=620, showlegend=False,
+        )
+
+    # ── Satellite mode ────────────────────────────────────────────────────────
+    # Uses go.Scattermapbox with Esri World Imagery tiles (free, no API key).
+    # Center is placed near lon=-175 (just east of the antimeridian) so that
+    # positive-longitude (Asia) and negative-longitude (Americas) route segments
+    # both fall inside the visible tile viewport, eliminating the Pacific gap.
+    elif mode == "satellite":
+        sv   = SAT_VIEW[region]
+        view = mapbox_view(sv["lat"], sv["lon"], sv["zoom"])
+        if lod_on:
+            with diagnostics.stage("lod"):
+                lod = apply_lod(normalized, view, airports)
+        if sat_renderer == "gpu":
+            # GPU layers keep every route but always space vertices for the view
+            route_layers = add_routes_mapbox_gl(
+                fig, normalized, route_color, scale_width, airports,
+                arc_cache=arc_cache, lod=lod or dict(segment_km=lod_segment_km(view)))
+        else:
+            route_layers = []
+            add_routes_mapbox(fig, normalized, route_color, scale_width, airports,
+                              arc_cache=arc_cache, lod=lod)
+        if show_airports and stats:
+            add_airports_mapbox(fig, stats, route_color, show_labels, airports)
+        fig.update_layout(
+            mapbox=dict(
+                style="white-bg",
+                zoom=sv["zoom"],
+                center=dict(lat=sv["lat"], lon=sv["lon"]),
+                layers=[{"below": "traces", "sourcetype": "raster",
+                         "source": [ESRI_SAT]}, *route_layers],
+            ),
+            margin=dict(r=0, t=0, l=0, b=0),
+            height=680, showlegend=False,
+            paper_bgcolor="rgba(0,0,0,0)",
+        )
+
+    else:
+        raise ValueError(f"Unknown mode {mode!r}; expected one of {MODES}")
+
+    return fig, lod
+
+
+# ── Timeline animation ────────────────────────────────────────────────────────
+def build_timeline_figure(timeline, stats, freq="M", mode="globe",
+                          style_key="🌿 Natural", color_key="Crimson Red",
+                          region="Asia-Pacific", show_airports=True, show_labels=False,
+                          arc_cache=None, airports=None):
+    """
+    Animate a `RouteTimeline` period by period (`freq` a pandas period
+    alias); returns the figure.
+
+    Each period's newly flown routes are one trace, built once from (cached)
+    arc geometry.  A frame only switches the traces of its period and the
+    earlier ones on, dimming the earlier ones, so it carries a few flags
+    rather than a re-rendered map.  The figure opens on the last frame;
+    with no periods (an empty timeline) it is the static base map.
+    """
+    periods, new = timeline.new_routes(freq)
+    if len(periods) > MAX_FRAMES:
+        raise ValueError(f"{len(periods)} periods is more than {MAX_FRAMES} frames; "
+                         f"use a longer period")
+    fig, _ = build_figure(Counter(), stats, mode, style_key, color_key, region,
+                          show_airports, show_labels, use_lod=False,
+                          arc_cache=arc_cache, airports=airports)
+    if not len(periods):
+        return fig
+    trace_cls   = go.Scattermapbox if mode == "satellite" else go.Scattergeo
+    route_color = COLOR_THEMES[color_key]
+    labels      = [str(p) for p in periods]
+    k           = len(labels)
+
+    with diagnostics.stage("period traces"):
+        for i, (label, counts) in enumerate(zip(labels, new)):
+            names = {(o, d): f"✈ {o} → {d} · since {label}" for o, d in counts}
+            lons, lats, texts = route_batches(counts, False, airports, arc_cache, names).get(
+                1, (np.empty(0), np.empty(0), np.empty(0, dtype=object)))
+            fig.add_trace(trace_cls(
+                lon=lons, lat=lats, mode="lines",
+                line=dict(width=2.0, color=route_color),
+                opacity=1.0 if i == k - 1 else PAST_OPACITY,
+                hoverinfo="text", text=texts, showlegend=False, name=label,
+            ))
+            diagnostics.count("points", lons.size)
+        fig.data = fig.data[-k:] + fig.data[:-k]        # routes under the markers
+
+    with diagnostics.stage("frames"):
+        kind = trace_cls().type
+        fig.frames = [
+            go.Frame(name=label, traces=list(range(k)), data=[
+                dict(type=kind, visible=j <= i, opacity=1.0 if j == i else PAST_OPACITY)
+                for j in range(k)])
+            for i, label in enumerate(labels)
+        ]
+        diagnostics.count("frames", k)
+
+    play = dict(mode="immediate", frame=dict(duration=FRAME_MS, redraw=True),
+                transition=dict(duration=0))
+    fig.update_layout(
+        margin=dict(b=60),
+        updatemenus=[dict(
+            type="buttons", direction="left", showactive=False,
+            x=0.0, y=0.0, xanchor="left", yanchor="top",
+            buttons=[dict(label="▶", method="animate", args=[None, play]),
+                     dict(label="⏸", method="animate",
+                          args=[[None], dict(play, frame=dict(duration=0, redraw=False))])],
+        )],
+        sliders=[dict(
+            active=k - 1, x=0.08, len=0.92, y=0.0, yanchor="top",
+            currentvalue=dict(prefix="Up to "),
+            steps=[dict(label=label, method="animate", args=[[label], play])
+                   for label in labels],
+        )],
+    )
+    return fig
+
+
+# ── Figure cache ──────────────────────────────────────────────────────────────
+def route_digest(normalized) -> str:
+    """Order-independent fingerprint of a route → count mapping."""
+    if not normalized:
+        return "0"
+    rows = np.array([f"{o}\t{d}\t{n}" for (o, d), n in normalized.items()], dtype=object)
+    return f"{rows.size}:{int(pd.util.hash_array(rows).sum(dtype=np.uint64)):016x}"
+
+
+def _figure_nbytes(fig) -> int:
+    """Approximate size of a figure's per-point arrays and map-layer sources."""
+    n = 0
+    for trace in fig.data:
+        for attr in ("lon", "lat", "text", "hovertext"):
+            v = getattr(trace, attr, None)
+            if v is not None and not isinstance(v, str):
+                n += np.asarray(v).nbytes
+    if fig.layout.mapbox.layers:
+        n += sum(len(layer.source) for layer in fig.layout.mapbox.layers
+                 if isinstance(layer.source, str))
+    return n
+
+
+def restyle_figure(fig, old_color, color_key, style_key=None):
+    """
+    Recolor a `build_figure` result in place: routes and airport markers
+    from COLOR_THEMES[old_color] to COLOR_THEMES[color_key], and, for
+    Globe / Flat figures, the map theme to GLOBE_STYLES[style_key].
+    """
+    old, new = COLOR_THEMES[old_color], COLOR_THEMES[color_key]
+    if old != new:
+        for trace in fig.data:
+            if trace.line.color == old:
+                trace.line.color = new
+            if trace.marker.color == old:
+                trace.marker.color = new
+        for layer in fig.layout.mapbox.layers:
+            if layer.color == old:
+                layer.color = new
+    if style_key is not None and fig.layout.geo.projection.type is not None:
+        gs = GLOBE_STYLES[style_key]
+        fig.update_layout(
+            geo=dict(landcolor=gs["land"], oceancolor=gs["ocean"],
+                     countrycolor=gs["country"], coastlinecolor=gs["coast"],
+                     lakecolor=gs["ocean"], bgcolor=gs["bg"]),
+            paper_bgcolor=gs["bg"],
+        )
+    return fig
+
+
+class FigureCache:
+    """
+    `build_figure` with a bounded memo shared by every caller.
+
+    Figures are keyed by route set (`route_digest`) and every render
+    parameter.  A repeat request returns the cached figure as-is.  A
+    request that differs only in `style_key` / `color_key` recolors a copy
+    of a cached figure of the same geometry (`restyle_figure`) instead of
+    rebuilding its traces.  Cached figures are never modified after they
+    are stored, and returned figures are shared, so treat them as
+    read-only.
+
+    `maxsize` bounds the number of figures and `max_bytes` the approximate
+    size of their point data; the least recently used go first.
+    """
+
+    def __init__(self, maxsize: int = 32, max_bytes: int = 512 * 2**20):
+        self.maxsize   = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes    = 0
+        self.hits = self.restyled = self.misses = 0
+        self._figs = OrderedDict()    # geometry key + (style, color) → [fig, lod, nbytes]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figs)
+
+    def build(self, normalized, stats, mode="globe", style_key="🌿 Natural",
+              color_key="Crimson Red", region="Asia-Pacific", show_airports=True,
+              show_labels=False, scale_width=True, use_lod=True,
+              sat_renderer="standard", arc_cache=None, airports=None):
+        """Same contract as `build_figure`; `stats` must describe `normalized`."""
+        airports = get_registry() if airports is None else airports
+        geometry = (route_digest(normalized), mode, region, show_airports, show_labels,
+                    scale_width, use_lod, sat_renderer, id(airports))
+        key = geometry + (style_key, color_key)
+        with self._lock:
+            entry = self._figs.get(key)
+            if entry is not None:
+                self._figs.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1]
+            # Most recently used figure with the same traces, in any style
+            base = next(((k, e) for k, e in reversed(self._figs.items())
+                         if k[:-2] == geometry), None)
+            if base is None:
+                self.misses += 1
+            else:
+                self.restyled += 1
+
+        if base is None:
+            fig, lod = build_figure(normalized, stats, mode, style_key, color_key, region,
+                                    show_airports, show_labels, scale_width, use_lod,
+                                    sat_renderer, arc_cache, airports)
+        else:
+            (*_, old_color), (old_fig, lod, _) = base
+            fig = restyle_figure(go.Figure(old_fig), old_color, color_key, style_key)
+        nbytes = _figure_nbytes(fig)
+        with self._lock:
+            old = self._figs.pop(key, None)
+            self.nbytes += nbytes - (old[2] if old else 0)
+            self._figs[key] = [fig, lod, nbytes]
+            while self._figs and (len(self._figs) > self.maxsize
+                                  or self.nbytes > self.max_bytes):
+                self.nbytes -= self._figs.popitem(last=False)[1][2]
+        return fig, lod
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.restyled + self.misses
+        return dict(size=len(self._figs), nbytes=self.nbytes, hits=self.hits,
+                    restyled=self.restyled, misses=self.misses,
+                    hit_rate=(self.hits + self.restyled) / lookups if lookups else 0.0)
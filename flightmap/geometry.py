@@ -0,0 +1,129 @@
+"""
+Great-circle helpers.
+
+`great_circle_arcs` is the batch engine: it takes coordinate arrays for
+many routes and returns every arc as one contiguous NaN-separated array,
+with vertex counts scaled to each arc's length.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def _geod():
+    """WGS84 geodesic, built on first use so importing this module stays cheap."""
+    from pyproj import Geod
+    return Geod(ellps="WGS84")
+
+
+# Adaptive density: one vertex every ARC_SEGMENT_KM, capped at MAX_NPTS
+# intermediate points (the old fixed density) for the longest hauls.
+ARC_SEGMENT_KM = 100.0
+MAX_NPTS       = 100
+
+
+def arc_npts(dist_m, segment_km=ARC_SEGMENT_KM, max_npts=MAX_NPTS):
+    """Intermediate point count for arcs of length `dist_m` (metres)."""
+    n = np.ceil(np.asarray(dist_m, dtype=float) / (segment_km * 1000)) - 1
+    return np.clip(n, 0, max_npts).astype(np.int64)
+
+
+def great_circle_arcs(lon1, lat1, lon2, lat2, npts=None,
+                      segment_km=ARC_SEGMENT_KM, max_npts=MAX_NPTS):
+    """
+    Geodesic arcs for many routes in one vectorized pass.
+
+    Returns (lons, lats, arc): float arrays holding every arc back to back,
+    with NaN between arcs and wherever an arc crosses the antimeridian, and
+    an int array giving each element's route index (-1 on NaN breaks).
+
+    Each arc gets `npts` intermediate points if given, otherwise a count
+    proportional to its length (see `arc_npts`).  Zero-length arcs
+    collapse to a single point.
+    """
+    lon1, lat1, lon2, lat2 = (np.asarray(a, dtype=float).ravel()
+                              for a in (lon1, lat1, lon2, lat2))
+    n_arcs = lon1.size
+    if n_arcs == 0:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+
+    az, _, dist = _geod().inv(lon1, lat1, lon2, lat2)
+    dist   = np.asarray(dist, dtype=float)
+    interior = (np.full(n_arcs, npts, dtype=np.int64) if npts is not None
+                else arc_npts(dist, segment_km, max_npts))
+    n_vert = np.where(dist > 0, interior + 2, 1)
+
+    # Vertex k of arc i sits at fraction k / (n_vert[i] - 1) along the arc.
+    arc    = np.repeat(np.arange(n_arcs), n_vert)
+    starts = np.cumsum(n_vert) - n_vert
+    k      = np.arange(arc.size) - starts[arc]
+    frac   = k / np.maximum(n_vert[arc] - 1, 1)
+    lons, lats, _ = _geod().fwd(lon1[arc], lat1[arc], np.asarray(az)[arc],
+                              dist[arc] * frac)
+    lons, lats = np.asarray(lons, dtype=float), np.asarray(lats, dtype=float)
+    # Pin endpoints exactly (fwd leaves ~1e-9° residue on the far end).
+    last = starts + n_vert - 1
+    lons[starts], lats[starts] = lon1, lat1
+    lons[last],   lats[last]   = lon2, lat2
+
+    # Break before each new arc.  Where an arc jumps the antimeridian, end
+    # it at ±180 and resume at ∓180 on the same latitude, so coarse arcs
+    # still reach the edge on both sides.
+    cross  = np.flatnonzero((np.abs(np.diff(lons)) > 180) & (arc[1:] == arc[:-1]))
+    edge   = np.where(lons[cross] > 0, 180.0, -180.0)
+    lat_x  = _crossing_lat(lons[cross], lats[cross], lons[cross + 1] + 2 * edge,
+                           lats[cross + 1], edge)
+    at     = np.concatenate([starts[1:], np.repeat(cross + 1, 3)])
+    nans   = np.full(cross.size, np.nan)
+    lons   = np.insert(lons, at, np.concatenate(
+        [np.full(n_arcs - 1, np.nan), np.column_stack([edge, nans, -edge]).ravel()]))
+    lats   = np.insert(lats, at, np.concatenate(
+        [np.full(n_arcs - 1, np.nan), np.column_stack([lat_x, nans, lat_x]).ravel()]))
+    arc    = np.insert(arc, at, np.concatenate(
+        [np.full(n_arcs - 1, -1),
+         np.column_stack([arc[cross], np.full(cross.size, -1), arc[cross]]).ravel()]))
+    return lons, lats, arc
+
+
+def _crossing_lat(lon1, lat1, lon2, lat2, lon):
+    """
+    Latitude at longitude `lon` on the great circle through two points,
+    with longitudes unwrapped so that `lon` lies between them.
+    """
+    lon1, lat1, lon2, lat2, lon = (np.radians(a) for a in (lon1, lat1, lon2, lat2, lon))
+    span = np.sin(lon2 - lon1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lat = np.arctan((np.tan(lat1) * np.sin(lon2 - lon)
+                         + np.tan(lat2) * np.sin(lon - lon1)) / span)
+    # Samples (nearly) on opposite meridians, e.g. over a pole: interpolate
+    linear = lat1 + (lat2 - lat1) * (lon - lon1) / np.where(lon2 != lon1, lon2 - lon1, 1)
+    return np.degrees(np.where(np.abs(span) > 1e-9, lat, linear))
+
+
+def arc_midpoints(lon1, lat1, lon2, lat2):
+    """(lon, lat) halfway along each geodesic."""
+    az, _, dist = _geod().inv(lon1, lat1, lon2, lat2)
+    lon, lat, _ = _geod().fwd(lon1, lat1, az, np.asarray(dist) / 2)
+    return np.asarray(lon), np.asarray(lat)
+
+
+def dist_km_many(lon1, lat1, lon2, lat2) -> np.ndarray:
+    """Geodesic km between coordinate arrays (NaN in, NaN out)."""
+    _, _, d = _geod().inv(*(np.asarray(a, dtype=float) for a in (lon1, lat1, lon2, lat2)))
+    return np.asarray(d) / 1000
+
+
+# Mean Earth radius (IUGG); haversine on this sphere stays within 0.6 % of
+# the WGS84 geodesic — at most ~38 km, on long north–south routes.
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lon1, lat1, lon2, lat2) -> np.ndarray:
+    """Spherical approximation of `dist_km_many`, several times faster."""
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(a, dtype=float))
+                              for a in (lon1, lat1, lon2, lat2))
+    h = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
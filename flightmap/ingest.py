@@ -0,0 +1,350 @@
+"""
+Flight-log ingest.
+
+`read_routes` turns a CSV / CSV.gz / Parquet log into a `RouteTable`: the
+origin and destination columns encoded as integer ids into a sorted array
+of airport codes.  Cleaning (strip, uppercase, length check, ICAO → IATA)
+runs once per distinct raw code rather than once per row.
+
+An optional `date` column (any format pandas can parse, with or without
+a time of day) is kept as a per-flight timestamp for time-series views.
+
+`read_many` loads several logs at once: parsed concurrently, skipping any
+already in a `LogCache`, then merged with flights repeated across logs
+counted once.
+
+`stream_route_counts` handles logs too big for memory: it reads fixed-size
+chunks and keeps only the running route-pair counts.
+"""
+
+import contextvars
+import gzip
+import hashlib
+import io
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import diagnostics
+from .airports import get_registry
+from .distance import get_distances
+
+try:    # optional: roughly 3× faster CSV parsing than the C engine
+    import pyarrow  # noqa: F401
+    _CSV_ENGINE = "pyarrow"
+except ImportError:
+    _CSV_ENGINE = "c"
+
+COLUMNS     = ("origin", "destination")
+DATE_COLUMN = "date"
+CHUNK_ROWS = 500_000
+
+
+class RouteTable:
+    """
+    Columnar flight log.
+
+    `codes` is the sorted array of airport codes; `origin` and `dest` hold
+    int32 indices into it, one entry per flight.  Because `codes` is
+    sorted, comparing ids compares codes.  `time`, when the log has dates,
+    is a parallel datetime64[ns] array (NaT where a date is missing).
+    """
+
+    def __init__(self, codes, origin, dest, time=None):
+        self.codes  = np.asarray(codes, dtype=object)
+        self.origin = np.asarray(origin, dtype=np.int32)
+        self.dest   = np.asarray(dest,   dtype=np.int32)
+        self.time   = None if time is None else np.asarray(time, dtype="datetime64[ns]")
+
+    def __len__(self):
+        return self.origin.size
+
+    def __iter__(self):
+        """(origin, destination) code pairs, for row-at-a-time callers."""
+        return zip(self.codes[self.origin], self.codes[self.dest])
+
+    @classmethod
+    def from_pairs(cls, pairs) -> "RouteTable":
+        o, d = np.array(list(pairs), dtype=object).reshape(-1, 2).T
+        ids, codes = pd.factorize(np.concatenate([o, d]), sort=True)
+        return cls(codes, ids[:o.size], ids[o.size:])
+
+    @classmethod
+    def concat(cls, tables) -> "RouteTable":
+        """Every flight of `tables`, in order, over the union of their codes."""
+        tables = list(tables)
+        codes  = np.array(sorted(set().union(*(t.codes.tolist() for t in tables))),
+                          dtype=object)
+        remaps = [np.searchsorted(codes, t.codes).astype(np.int32) for t in tables]
+        time   = None
+        if any(t.time is not None for t in tables):
+            time = np.concatenate([t.time if t.time is not None
+                                   else np.full(len(t), np.datetime64("NaT", "ns"))
+                                   for t in tables] or [np.empty(0, "datetime64[ns]")])
+        return cls(codes,
+                   np.concatenate([m[t.origin] for m, t in zip(remaps, tables)] or [[]]),
+                   np.concatenate([m[t.dest] for m, t in zip(remaps, tables)] or [[]]),
+                   time)
+
+    @classmethod
+    def merge(cls, tables) -> "RouteTable":
+        """
+        Union of several logs of the same flights.  Each dated record
+        (origin, destination, time) is kept as many times as the one table
+        holding most copies of it has it: a flight logged in several files
+        counts once, while repeats within one file all stay.  Undated
+        flights are all kept, since a repeat trip can't be told from a
+        duplicate without a date.
+        """
+        tables = list(tables)
+        merged = cls.concat(tables)
+        if len(tables) < 2 or merged.time is None:
+            return merged
+        # One int64 id per distinct record, all hash-based (no sort)
+        times, distinct = pd.factorize(merged.time.view(np.int64))
+        pair = merged.origin.astype(np.int64) * merged.codes.size + merged.dest
+        if merged.codes.size ** 2 * distinct.size >= 2**63:
+            pair = pd.factorize(pair)[0]
+        key, records = pd.factorize(pair * distinct.size + times)
+
+        # Most copies of each record in any one table (tables are contiguous)
+        bounds = np.cumsum([0] + [len(t) for t in tables])
+        most   = np.zeros(records.size, dtype=np.int64)
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            np.maximum(most, np.bincount(key[lo:hi], minlength=records.size), out=most)
+
+        # Only records with copies beyond that need their rows ranked
+        over = np.bincount(key, minlength=records.size) > most
+        sel  = np.flatnonzero(over[key] & ~np.isnat(merged.time))
+        if not sel.size:
+            return merged
+        rank = pd.Series(key[sel]).groupby(key[sel], sort=False).cumcount().to_numpy()
+        keep = np.ones(len(merged), dtype=bool)
+        keep[sel] = rank < most[key[sel]]
+        return cls(merged.codes, merged.origin[keep], merged.dest[keep], merged.time[keep])
+
+    def visits(self) -> Counter:
+        """Airport → number of departures + arrivals."""
+        n = np.bincount(np.concatenate([self.origin, self.dest]),
+                        minlength=self.codes.size)
+        nz = np.flatnonzero(n)
+        return Counter(dict(zip(self.codes[nz].tolist(), n[nz].tolist())))
+
+    def route_counts(self) -> Counter:
+        """Direction-agnostic (a, b) → flights, with a < b as in sorted(pair)."""
+        n   = self.codes.size
+        lo  = np.minimum(self.origin, self.dest).astype(np.int64)
+        hi  = np.maximum(self.origin, self.dest).astype(np.int64)
+        key, cnt = np.unique(lo * n + hi, return_counts=True)
+        pairs = zip(self.codes[key // n].tolist(), self.codes[key % n].tolist())
+        return Counter(dict(zip(pairs, cnt.tolist())))
+
+    def airport_rows(self, airports=None):
+        """Registry row of every origin and destination (-1 where unknown)."""
+        airports = get_registry() if airports is None else airports
+        rows = airports.rows(self.codes)
+        return rows[self.origin], rows[self.dest]
+
+    def flight_km(self, airports=None, distances=None) -> np.ndarray:
+        """float32 km per flight (NaN where an airport is unknown), measured
+        once per distinct airport pair."""
+        airports  = get_registry() if airports is None else airports
+        distances = get_distances(airports) if distances is None else distances
+        n   = self.codes.size
+        key = np.minimum(self.origin, self.dest).astype(np.int64)
+        key *= n
+        key += np.maximum(self.origin, self.dest)
+        # Hash-based, so no sort over every flight
+        inv, pairs = pd.factorize(key)
+        rows = airports.rows(self.codes)
+        km   = distances.rows_km(rows[pairs // n], rows[pairs % n])
+        return km.astype(np.float32)[inv]
+
+    def coords(self, airports=None):
+        """(lon1, lat1, lon2, lat2) per flight, NaN where the airport is unknown."""
+        airports = get_registry() if airports is None else airports
+        lon, lat = airports.coords(self.codes)
+        return lon[self.origin], lat[self.origin], lon[self.dest], lat[self.dest]
+
+
+def _read_frame(src) -> pd.DataFrame:
+    """
+    Origin/destination columns as strings, plus the date column if the
+    log has one, from a path or raw bytes.
+    """
+    raw = isinstance(src, (bytes, bytearray))
+
+    def fresh():
+        return io.BytesIO(src) if raw else src
+
+    if (src[:4] == b"PAR1") if raw else Path(src).suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return pd.read_parquet(fresh(), columns=_usecols(pq.read_schema(fresh()).names))
+    compression = ("gzip" if src[:2] == b"\x1f\x8b" else None) if raw else "infer"
+    header = pd.read_csv(fresh(), nrows=0, compression=compression).columns
+    return pd.read_csv(fresh(), usecols=_usecols(header), dtype=str,
+                       compression=compression, engine=_CSV_ENGINE)
+
+
+def _usecols(names) -> list[str]:
+    """COLUMNS, plus DATE_COLUMN when `names` has it."""
+    return list(COLUMNS) + [DATE_COLUMN] * (DATE_COLUMN in set(names))
+
+
+def _parse_times(values) -> np.ndarray:
+    """datetime64[ns] per value (UTC, naive), parsed once per distinct value."""
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return values.dt.tz_convert(None).to_numpy("datetime64[ns]")
+    if pd.api.types.is_datetime64_dtype(values):
+        return values.to_numpy("datetime64[ns]")
+    ids, uniq = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(uniq, dtype=object), errors="coerce",
+                            format="mixed", utc=True).dt.tz_localize(None)
+    # ids == -1 (missing) picks the trailing NaT
+    return np.append(parsed.to_numpy("datetime64[ns]"), np.datetime64("NaT", "ns"))[ids]
+
+
+def encode_routes(origin, dest, airports=None, time=None) -> RouteTable:
+    """
+    Clean and integer-encode raw origin/destination columns.
+
+    Rows where either code is missing or not 3-4 letters are dropped; ICAO
+    codes known to the registry are rewritten to IATA.  `time`, a raw date
+    column, is parsed into the table's timestamps (NaT where unparseable).
+    """
+    airports = get_registry() if airports is None else airports
+    origin, dest = pd.Series(origin), pd.Series(dest)
+    n = len(origin)
+    raw_ids, raw = pd.factorize(pd.concat([origin, dest], ignore_index=True))
+
+    clean = pd.Series(raw, dtype=object).astype(str).str.strip().str.upper()
+    valid = clean.str.len().isin((3, 4)).to_numpy()
+    clean = np.array([airports.canonical(c) for c in clean], dtype=object)
+    codes = np.array(sorted(set(clean[valid].tolist())), dtype=object)
+    remap = np.full(raw.size + 1, -1, dtype=np.int32)   # [-1] ← NaN sentinel
+    remap[:raw.size][valid] = np.searchsorted(codes, clean[valid])
+
+    ids  = remap[raw_ids]
+    o, d = ids[:n], ids[n:]
+    keep = (o >= 0) & (d >= 0)
+    return RouteTable(codes, o[keep], d[keep],
+                      None if time is None else _parse_times(time)[keep])
+
+
+def read_routes(src, airports=None) -> RouteTable:
+    """Load a flight log (path or raw CSV / CSV.gz / Parquet bytes)."""
+    with diagnostics.stage("parse"):
+        df = _read_frame(src)
+    with diagnostics.stage("encode"):
+        return encode_routes(df["origin"], df["destination"], airports,
+                             df.get(DATE_COLUMN))
+
+
+def content_digest(data) -> str:
+    """Hex digest of a log's bytes, the key of a `LogCache`."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def read_many(sources, cache=None, digests=None, workers=None,
+              airports=None) -> tuple[RouteTable, dict]:
+    """
+    Load several logs (raw bytes each) into one table; returns (table, report).
+
+    Logs not already in `cache` (a `LogCache`) are parsed on a thread pool
+    (the CSV and Parquet readers release the GIL) and added to it.
+    `digests` may pass precomputed content digests.  Identical files count
+    once; the rest are merged in input order, a flight record found in
+    several logs kept once (`RouteTable.merge`).  A log that fails to parse is left out; the
+    report has files, parsed, cached, duplicates, and errors as
+    {index: message}.
+    """
+    digests = list(digests) if digests is not None else [content_digest(s) for s in sources]
+    tables  = [cache.get(d) if cache is not None else None for d in digests]
+    todo    = {d: i for i, (d, t) in reversed(list(enumerate(zip(digests, tables))))
+               if t is None}    # first index per missing digest
+    parsed, errors = {}, {}
+    if todo:
+        workers = workers or min(len(todo), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Each task in a copy of this context, so its parse / encode
+            # stages land under the caller's diagnostics stage
+            futures = {pool.submit(contextvars.copy_context().run, read_routes,
+                                   sources[i], airports): d
+                       for d, i in todo.items()}
+            for future in as_completed(futures):
+                d = futures[future]
+                try:
+                    parsed[d] = future.result()
+                except Exception as e:
+                    errors[todo[d]] = str(e)
+                    continue
+                if cache is not None:
+                    cache.put(d, parsed[d])
+
+    found  = {d: t for d, t in zip(digests, tables) if t is not None} | parsed
+    total  = sum(len(found[d]) for d in digests if d in found)
+    merged = RouteTable.merge(found[d] for d in dict.fromkeys(digests) if d in found)
+    return merged, dict(files=len(digests), parsed=len(todo),
+                        cached=sum(d not in todo for d in digests),
+                        duplicates=total - len(merged), errors=errors)
+
+
+def iter_route_chunks(src, chunksize=CHUNK_ROWS, airports=None, progress=None):
+    """
+    Yield a `RouteTable` per `chunksize` rows of a flight log.
+
+    `src` is a path, raw bytes or a seekable binary file object.
+    `progress(fraction)` is called after each chunk with the share of the
+    input consumed so far.
+    """
+    with ExitStack() as stack:
+        if isinstance(src, (bytes, bytearray)):
+            fh = io.BytesIO(src)
+        elif isinstance(src, (str, Path)):
+            fh = stack.enter_context(open(src, "rb"))
+        else:
+            fh = src
+        total = fh.seek(0, io.SEEK_END) or 1
+        fh.seek(0)
+        magic = fh.read(4)
+        fh.seek(0)
+
+        if magic == b"PAR1":
+            import pyarrow.parquet as pq
+            pf   = pq.ParquetFile(fh)
+            done = 0
+            for batch in pf.iter_batches(batch_size=chunksize, columns=list(COLUMNS)):
+                df    = batch.to_pandas()
+                done += len(df)
+                yield encode_routes(df["origin"], df["destination"], airports)
+                if progress:
+                    progress(done / max(pf.metadata.num_rows, 1))
+            return
+
+        text   = gzip.GzipFile(fileobj=fh) if magic[:2] == b"\x1f\x8b" else fh
+        reader = stack.enter_context(pd.read_csv(
+            text, usecols=list(COLUMNS), dtype=str, chunksize=chunksize))
+        for df in reader:
+            yield encode_routes(df["origin"], df["destination"], airports)
+            if progress:
+                progress(min(fh.tell() / total, 1.0))
+
+
+def stream_route_counts(src, chunksize=CHUNK_ROWS, airports=None,
+                        progress=None) -> Counter:
+    """
+    Direction-agnostic route counts of a log, read chunk by chunk.
+
+    Peak memory is one chunk plus the distinct-route Counter, whatever the
+    file size.  Equivalent to `read_routes(src).route_counts()`.
+    """
+    counts = Counter()
+    for chunk in iter_route_chunks(src, chunksize, airports, progress):
+        counts.update(chunk.route_counts())
+    return counts
@@ -0,0 +1,175 @@
+"""
+Level of detail for route rendering.
+
+A `View` describes the initial viewport of a map mode: its scale (km per
+pixel) and which coordinates it shows.  `apply_lod` uses it to
+
+  * space arc vertices a few pixels apart instead of every 100 km,
+  * cull routes that never enter the viewport,
+  * merge low-frequency routes whose endpoints land in the same screen
+    cells (coarsening the cells until a route budget is met), and drop
+    routes shorter than a couple of pixels,
+  * coarsen vertex spacing further if the result would still exceed a
+    fixed vertex budget,
+
+so the payload stays roughly constant however large the log grows.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from .airports import get_registry
+from .distance import get_distances
+from .geometry import arc_npts, great_circle_arcs
+
+EARTH_KM        = 40_075.0   # equatorial circumference
+VERTEX_PX       = 6          # target spacing between arc vertices
+MIN_ROUTE_PX    = 2          # shorter routes are dropped (markers still show them)
+CELL_PX         = 8          # snapping grid for merging routes …
+MAX_CELL_PX     = 256        # … widened up to this to meet ROUTE_BUDGET
+MERGE_MAX_COUNT = 2          # only routes flown at most this often are merged
+ROUTE_BUDGET    = 20_000
+VERTEX_BUDGET   = 250_000
+
+
+class View:
+    """Initial viewport: scale plus an optional visibility test."""
+
+    def __init__(self, km_per_px: float, visible=None):
+        self.km_per_px = km_per_px
+        self._visible  = visible
+
+    def visible(self, lon, lat) -> np.ndarray:
+        lon = np.asarray(lon, dtype=float)
+        if self._visible is None:
+            return ~np.isnan(lon)
+        return self._visible(lon, np.asarray(lat, dtype=float))
+
+
+def globe_view(lon0, lat0, height_px=680) -> View:
+    """Orthographic globe: the hemisphere around (lon0, lat0)."""
+    c0 = np.radians([lon0, lat0])
+
+    def visible(lon, lat):
+        lon, lat = np.radians(lon), np.radians(lat)
+        cos_d = (np.sin(lat) * np.sin(c0[1])
+                 + np.cos(lat) * np.cos(c0[1]) * np.cos(lon - c0[0]))
+        return cos_d > -0.05    # a little past the limb
+
+    return View(EARTH_KM / np.pi / height_px, visible)
+
+
+def flat_view(width_px=1200) -> View:
+    """Natural-earth world map: everything is on screen."""
+    return View(EARTH_KM / width_px)
+
+
+def mapbox_view(lat0, lon0, zoom, size_px=(1200, 680), slack=1.5) -> View:
+    """Web-Mercator viewport centred on (lat0, lon0); `slack` pads for panning."""
+    world_px = 256 * 2 ** zoom
+    half_w   = slack * size_px[0] / 2 / world_px * 360
+    y0       = np.log(np.tan(np.pi / 4 + np.radians(lat0) / 2))
+    half_h   = slack * size_px[1] / 2 / world_px * 2 * np.pi
+
+    def visible(lon, lat):
+        dx = (lon - lon0 + 180) % 360 - 180
+        y  = np.log(np.tan(np.pi / 4 + np.radians(np.clip(lat, -85, 85)) / 2))
+        return (np.abs(dx) <= half_w) & (np.abs(y - y0) <= half_h)
+
+    return View(EARTH_KM * np.cos(np.radians(lat0)) / world_px, visible)
+
+
+def lod_segment_km(view: View, vertex_px=VERTEX_PX) -> float:
+    """Vertex spacing for `view`, rounded to a power of two so cached
+    geometry is shared between nearby zoom levels."""
+    return float(2.0 ** np.round(np.log2(max(view.km_per_px * vertex_px, 1.0))))
+
+
+def apply_lod(normalized, view: View, airports=None,
+              route_budget=ROUTE_BUDGET, vertex_budget=VERTEX_BUDGET) -> dict:
+    """
+    Reduce {(a, b): flights} to what `view` can show.
+
+    Returns dict(routes, labels, segment_km, culled, merged, dropped):
+    `routes` replaces `normalized`, `labels` overrides hover text for merged
+    routes, and `segment_km` is the vertex spacing to render with.
+    """
+    airports = get_registry() if airports is None else airports
+    seg      = lod_segment_km(view)
+    out      = dict(routes=Counter(), labels={}, segment_km=seg,
+                    culled=0, merged=0, dropped=0)
+    pairs = [p for p in normalized if p[0] in airports and p[1] in airports]
+    if not pairs:
+        return out
+    cnts = np.array([normalized[p] for p in pairs])
+    a, b = np.array(pairs, dtype=object).T
+    lon1, lat1 = airports.coords(a)
+    lon2, lat2 = airports.coords(b)
+
+    # Cull: keep a route if any of five samples along it is on screen.
+    lons, lats, arc = great_circle_arcs(lon1, lat1, lon2, lat2, npts=3)
+    seen = np.zeros(len(pairs), dtype=bool)
+    np.logical_or.at(seen, arc[arc >= 0], view.visible(lons, lats)[arc >= 0])
+    out["culled"] = int((~seen).sum())
+
+    # Drop routes too short to see as lines.
+    km = get_distances(airports).km(a, b)
+    long_enough = km / view.km_per_px >= MIN_ROUTE_PX
+    out["dropped"] = int((seen & ~long_enough).sum())
+    keep = seen & long_enough
+
+    # Merge rare routes whose endpoints share screen cells, widening the
+    # cells until the route budget is met.
+    keep_frequent = keep & (cnts > MERGE_MAX_COUNT)
+    rare          = np.flatnonzero(keep & (cnts <= MERGE_MAX_COUNT))
+    cell_px = CELL_PX
+    while True:
+        groups = _merge_cells(lat1[rare], lon1[rare], lat2[rare], lon2[rare],
+                              cnts[rare], cell_px * view.km_per_px / 111.32)
+        if (keep_frequent.sum() + len(groups) <= route_budget
+                or cell_px >= MAX_CELL_PX):
+            break
+        cell_px *= 2
+
+    for i in np.flatnonzero(keep_frequent):
+        out["routes"][pairs[i]] = int(cnts[i])
+    for lead, total, size in groups:
+        lead = pairs[rare[lead]]
+        out["routes"][lead] = total
+        if size > 1:
+            out["merged"] += size - 1
+            out["labels"][lead] = (f"✈ {lead[0]} → {lead[1]} and "
+                                   f"{size - 1} nearby routes  ×{total}")
+
+    # Coarsen further if the vertex count would still blow the budget
+    # (+3 per arc: both endpoints and the NaN separator).
+    index  = {p: i for i, p in enumerate(pairs)}
+    kept_m = km[[index[p] for p in out["routes"]]] * 1000
+    while (arc_npts(kept_m, seg).sum() + 3 * kept_m.size > vertex_budget
+           and seg < EARTH_KM):
+        seg *= 2
+    out["segment_km"] = seg
+    return out
+
+
+def _merge_cells(lat1, lon1, lat2, lon2, cnts, cell_deg):
+    """
+    Group routes whose (unordered) endpoints share `cell_deg` grid cells.
+
+    Returns [(lead, total flights, members)], where `lead` is the position
+    of the group's most-flown route.
+    """
+    if not cnts.size:
+        return []
+    ca = np.stack([np.floor(lat1 / cell_deg), np.floor(lon1 / cell_deg)], axis=1)
+    cb = np.stack([np.floor(lat2 / cell_deg), np.floor(lon2 / cell_deg)], axis=1)
+    swap = (ca[:, 0] > cb[:, 0]) | ((ca[:, 0] == cb[:, 0]) & (ca[:, 1] > cb[:, 1]))
+    ca[swap], cb[swap] = cb[swap], ca[swap]
+    _, grp, size = np.unique(np.hstack([ca, cb]), axis=0,
+                             return_inverse=True, return_counts=True)
+    grp    = grp.ravel()
+    totals = np.bincount(grp, weights=cnts).astype(np.int64)
+    order  = np.lexsort((-cnts, grp))
+    lead   = order[np.r_[0, np.flatnonzero(np.diff(grp[order])) + 1]]
+    return list(zip(lead.tolist(), totals.tolist(), size.tolist()))
@@ -0,0 +1,253 @@
+"""
+Route network analytics.
+
+`RouteNetwork` is the undirected graph implied by direction-agnostic route
+counts: one node per known airport, one edge per distinct route, weighted
+by its great-circle km from the shared `DistanceService` and carrying its
+flight count.  Adjacency is CSR — `indptr` / `indices` / `km` arrays over
+integer node ids — so hub, component and path queries are NumPy passes
+over flat arrays rather than walks over Python objects:
+
+  hubs            degree, flights or betweenness, top k
+  betweenness     Brandes, one vectorized BFS per source; sampled sources
+                  on large graphs
+  components      label propagation over the edge list, optionally
+                  restricted to one region's airports
+  shortest_path   A* on km with a great-circle heuristic
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from .airports import get_registry
+from .distance import get_distances
+from .geometry import haversine_km
+
+# Graphs with more airports than this get betweenness from a random sample
+# of this many BFS sources, scaled up, instead of from every airport
+BETWEENNESS_SAMPLES = 32
+
+HUB_MEASURES = ("degree", "flights", "betweenness")
+
+# haversine_km is within 0.6 % of the geodesic, so scaled by this it never
+# overestimates a remaining distance (or breaks the triangle inequality),
+# and A* stays exact
+_HEURISTIC_SCALE = 0.99
+
+
+class RouteNetwork:
+    """
+    Undirected, km-weighted route graph in CSR form.
+
+    Node ids index `codes` (sorted), `lon`, `lat` and `region`; edge `i`
+    joins `edge_a[i]` and `edge_b[i]`.  Airports missing from the registry
+    have no position, so they and their routes are left out.
+    """
+
+    def __init__(self, codes, edge_a, edge_b, edge_km, edge_flights, lon, lat, region):
+        self.codes        = np.asarray(codes, dtype=object)
+        self.lon          = np.asarray(lon, dtype=float)
+        self.lat          = np.asarray(lat, dtype=float)
+        self.region       = np.asarray(region, dtype=object)
+        self.edge_a       = np.asarray(edge_a, dtype=np.int64)
+        self.edge_b       = np.asarray(edge_b, dtype=np.int64)
+        self.edge_km      = np.asarray(edge_km, dtype=float)
+        self.edge_flights = np.asarray(edge_flights, dtype=np.int64)
+
+        # Both directions of every edge, grouped by source node
+        n     = self.codes.size
+        src   = np.concatenate([self.edge_a, self.edge_b])
+        order = np.argsort(src, kind="stable")
+        self.indptr  = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+        self.indices = np.concatenate([self.edge_b, self.edge_a])[order]
+        self.km      = np.concatenate([self.edge_km, self.edge_km])[order]
+        self._betweenness = {}
+
+    @classmethod
+    def from_route_counts(cls, route_counts, airports=None, distances=None) -> "RouteNetwork":
+        """From {(a, b): flights}, as returned by `RouteTable.route_counts`."""
+        airports  = get_registry() if airports is None else airports
+        distances = get_distances(airports) if distances is None else distances
+        pairs = np.array(list(route_counts), dtype=object).reshape(-1, 2)
+        cnts  = np.fromiter(route_counts.values(), dtype=np.int64, count=len(route_counts))
+
+        ids, codes = pd.factorize(pairs.T.ravel(), sort=True)
+        rows  = airports.rows(codes)
+        a, b  = ids[:len(cnts)], ids[len(cnts):]
+        km    = distances.rows_km(rows[a], rows[b])
+        keep  = np.isfinite(km) & (a != b)
+
+        # Renumber the airports that still have a route, keeping code order
+        used  = np.zeros(codes.size, dtype=bool)
+        used[a[keep]] = used[b[keep]] = True
+        remap = np.cumsum(used) - 1
+        rows  = rows[used]
+        return cls(codes[used], remap[a[keep]], remap[b[keep]], km[keep], cnts[keep],
+                   airports.lon[rows], airports.lat[rows], airports.region_of(rows))
+
+    def __len__(self):
+        return self.codes.size
+
+    @property
+    def n_edges(self) -> int:
+        return self.edge_a.size
+
+    def node(self, code: str) -> int:
+        """Node id of `code`; ValueError if it is not in the network."""
+        if isinstance(code, str):
+            i = int(np.searchsorted(self.codes, code))
+            if i < len(self) and self.codes[i] == code:
+                return i
+        raise ValueError(f"Airport {code!r} is not in the route network")
+
+    # ── Hubs ──────────────────────────────────────────────────────────────────
+    def degree(self) -> np.ndarray:
+        """Distinct routes per airport."""
+        return np.diff(self.indptr)
+
+    def flights(self) -> np.ndarray:
+        """Departures + arrivals per airport."""
+        return (np.bincount(self.edge_a, weights=self.edge_flights, minlength=len(self))
+                + np.bincount(self.edge_b, weights=self.edge_flights, minlength=len(self)))
+
+    def betweenness(self, samples: int = BETWEENNESS_SAMPLES, seed: int = 0) -> np.ndarray:
+        """
+        Hop-count betweenness per airport: how many shortest itineraries
+        (fewest legs) between other airports pass through it.  Exact up to
+        `samples` airports, otherwise estimated from that many random
+        sources.  Memoized per (samples, seed).
+        """
+        key = (samples, seed)
+        if key not in self._betweenness:
+            n = len(self)
+            sources = (np.arange(n) if n <= samples else
+                       np.random.default_rng(seed).choice(n, samples, replace=False))
+            bc = np.zeros(n)
+            for s in sources:
+                bc += self._dependencies(s)
+            # Every unordered pair is reached from both of its ends
+            self._betweenness[key] = bc * (n / max(sources.size, 1)) / 2
+        return self._betweenness[key]
+
+    def hubs(self, k: int = 10, by: str = "degree") -> list[tuple[str, float]]:
+        """Top `k` (code, value) by one of HUB_MEASURES, like Counter.most_common."""
+        if by not in HUB_MEASURES:
+            raise ValueError(f"Unknown hub measure {by!r}; expected one of {HUB_MEASURES}")
+        values = getattr(self, by)()
+        top    = np.argsort(-values, kind="stable")[:k]
+        return list(zip(self.codes[top].tolist(), values[top].tolist()))
+
+    def _neighbors(self, nodes):
+        """(source, neighbor) for every edge leaving `nodes`."""
+        start = self.indptr[nodes]
+        cnt   = self.indptr[nodes + 1] - start
+        off   = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        return np.repeat(nodes, cnt), self.indices[np.repeat(start, cnt) + off]
+
+    def _dependencies(self, s: int) -> np.ndarray:
+        """Brandes' dependency of `s` on every node, one BFS level at a time."""
+        n     = len(self)
+        depth = np.full(n, -1)
+        sigma = np.zeros(n)                   # shortest paths from s
+        depth[s], sigma[s] = 0, 1.0
+        frontier, levels, level = np.array([s]), [], 0
+        while frontier.size:
+            level   += 1
+            src, dst = self._neighbors(frontier)
+            seen     = depth[dst]
+            on       = (seen < 0) | (seen == level)   # edges into the next level
+            src, dst = src[on], dst[on]
+            depth[dst] = level
+            sigma   += np.bincount(dst, weights=sigma[src], minlength=n)
+            levels.append((src, dst))
+            frontier = np.flatnonzero(depth == level)
+
+        delta = np.zeros(n)
+        for src, dst in reversed(levels):
+            delta += np.bincount(src, weights=sigma[src] / sigma[dst] * (1 + delta[dst]),
+                                 minlength=n)
+        delta[s] = 0
+        return delta
+
+    # ── Connectivity ──────────────────────────────────────────────────────────
+    def component_labels(self, region: str | None = None) -> np.ndarray:
+        """
+        Component label per airport (the smallest node id in it), using
+        only routes with both ends in `region` if given; -1 outside it.
+        """
+        n      = len(self)
+        inside = np.ones(n, dtype=bool) if region is None else self.region == region
+        both   = inside[self.edge_a] & inside[self.edge_b]
+        a, b   = self.edge_a[both], self.edge_b[both]
+        labels = np.arange(n)
+        while True:
+            low = np.minimum(labels[a], labels[b])
+            new = labels.copy()
+            np.minimum.at(new, a, low)
+            np.minimum.at(new, b, low)
+            new = new[new]                    # jump to the label's own label
+            if np.array_equal(new, labels):
+                break
+            labels = new
+        labels[~inside] = -1
+        return labels
+
+    def components(self, region: str | None = None) -> list[list[str]]:
+        """Airport codes of each connected component, largest first."""
+        labels = self.component_labels(region)
+        ids    = np.flatnonzero(labels >= 0)
+        order  = ids[np.argsort(labels[ids], kind="stable")]
+        groups = np.split(self.codes[order], np.flatnonzero(np.diff(labels[order])) + 1)
+        return sorted((g.tolist() for g in groups if g.size), key=len, reverse=True)
+
+    def region_summary(self) -> list[dict]:
+        """Airports, routes, components and largest component per region."""
+        out = []
+        for region in sorted(set(self.region.tolist())):
+            labels = self.component_labels(region)
+            sizes  = np.bincount(labels[labels >= 0])
+            sizes  = sizes[sizes > 0]
+            inside = labels >= 0
+            out.append(dict(region=region, airports=int(inside.sum()),
+                            routes=int((inside[self.edge_a] & inside[self.edge_b]).sum()),
+                            components=int(sizes.size), largest=int(sizes.max())))
+        return out
+
+    # ── Paths ─────────────────────────────────────────────────────────────────
+    def shortest_path(self, origin: str, dest: str) -> dict | None:
+        """
+        Shortest great-circle itinerary over existing routes, as
+        dict(path=[codes], km=total, hops=legs); None if unreachable.
+        """
+        s, t = self.node(origin), self.node(dest)
+        h    = _HEURISTIC_SCALE * haversine_km(self.lon, self.lat, self.lon[t], self.lat[t])
+        dist = np.full(len(self), np.inf)
+        prev = np.full(len(self), -1)
+        done = np.zeros(len(self), dtype=bool)
+        dist[s] = 0.0
+        heap = [(h[s], s)]
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u == t:
+                break
+            if done[u]:
+                continue
+            done[u] = True
+            lo, hi = self.indptr[u], self.indptr[u + 1]
+            v, d   = self.indices[lo:hi], dist[u] + self.km[lo:hi]
+            better = d < dist[v]
+            v, d   = v[better], d[better]
+            dist[v], prev[v] = d, u
+            for f, x in zip((d + h[v]).tolist(), v.tolist()):
+                heapq.heappush(heap, (f, x))
+        if not np.isfinite(dist[t]):
+            return None
+
+        path = [t]
+        while path[-1] != s:
+            path.append(prev[path[-1]])
+        return dict(path=self.codes[path[::-1]].tolist(), km=float(dist[t]),
+                    hops=len(path) - 1)
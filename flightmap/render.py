@@ -0,0 +1,249 @@
+"""
+Plotly trace builders for routes and airport markers.
+
+Routes are batched: every arc whose frequency falls in the same bucket
+shares one NaN-separated trace, so the number of route traces is bounded
+by len(ROUTE_BUCKETS) rather than by the number of distinct city pairs.
+Airports are a single marker trace with per-point sizes and labels.
+"""
+
+import json
+from urllib.parse import quote
+
+import numpy as np
+import plotly.graph_objects as go
+
+from . import diagnostics
+from .airports import get_registry
+from .geometry import ARC_SEGMENT_KM, arc_midpoints, great_circle_arcs
+
+# Lower edges of the frequency buckets; a bucket's edge sets the width and
+# opacity of every route in it.  Counts 1-5 keep their exact styling.
+ROUTE_BUCKETS = (1, 2, 3, 4, 5, 7, 10, 15, 25)
+
+
+# Airport marker size by visit count: ≤5 → 8, ≤10 → 12, ≤15 → 16, else 20
+MARKER_BUCKETS = (5, 10, 15)
+MARKER_SIZES   = (8, 12, 16, 20)
+
+
+def marker_size(count):
+    """Bucketed sizes to reduce visual inflation from transit counts
+    (scalar or array)."""
+    return np.asarray(MARKER_SIZES)[np.searchsorted(MARKER_BUCKETS, count)]
+
+
+def route_bucket(cnt):
+    """Bucket edge for a count (or array of counts)."""
+    edges = np.asarray(ROUTE_BUCKETS)
+    return edges[np.searchsorted(edges, cnt, side="right") - 1]
+
+
+def route_style(cnt: int, scale_width: bool) -> tuple[float, float]:
+    """(width, opacity) of a route flown `cnt` times."""
+    width   = (1.5 + 0.7 * (cnt - 1)) if scale_width else 2.0
+    opacity = min(0.45 + 0.12 * cnt, 0.95) if scale_width else 0.65
+    return width, opacity
+
+
+def route_label(o: str, d: str, cnt: int) -> str:
+    return f"✈ {o} → {d}" + (f"  ×{cnt}" if cnt > 1 else "")
+
+
+def _known_routes(normalized, airports, labels=None):
+    """(coords (n, 4), counts, hover labels) of routes with both airports known."""
+    labels = labels or {}
+    empty  = (np.empty((0, 4)), np.empty(0, dtype=np.int64), np.empty(0, dtype=object))
+    if not normalized:
+        return empty
+    pairs = np.array(list(normalized), dtype=object).reshape(-1, 2)
+    cnts  = np.fromiter(normalized.values(), dtype=np.int64, count=len(normalized))
+    ro, rd = airports.rows(pairs[:, 0]), airports.rows(pairs[:, 1])
+    ok     = np.flatnonzero((ro >= 0) & (rd >= 0))
+    if ok.size == 0:
+        return empty
+    ro, rd, pairs, cnts = ro[ok], rd[ok], pairs[ok], cnts[ok]
+    coords = np.column_stack([airports.lon[ro], airports.lat[ro],
+                              airports.lon[rd], airports.lat[rd]])
+    texts  = np.array([labels.get((o, d)) or route_label(o, d, c)
+                       for (o, d), c in zip(pairs.tolist(), cnts.tolist())],
+                      dtype=object)
+    return coords, cnts, texts
+
+
+def _bucket_arcs(coords, cnts, scale_width, arc_cache, segment_km):
+    """Yield (bucket, route indices, lons, lats, arc) per frequency bucket."""
+    arc_fn = arc_cache.arcs if arc_cache is not None else great_circle_arcs
+    keys   = route_bucket(cnts) if scale_width else np.ones_like(cnts)
+    for key in np.unique(keys):
+        idx = np.flatnonzero(keys == key)
+        with diagnostics.stage("arcs"):
+            arcs = arc_fn(*coords[idx].T, segment_km=segment_km)
+        yield (int(key), idx, *arcs)
+
+
+def route_batches(normalized, scale_width, airports=None, arc_cache=None,
+                  labels=None, segment_km=ARC_SEGMENT_KM) -> dict:
+    """
+    Pack every arc into one (lons, lats, texts) batch per frequency bucket.
+
+    Arcs are NaN-separated so Plotly draws them as distinct lines; `texts`
+    runs parallel to the coordinates so each point keeps its own route's
+    hover label (`labels` overrides it per route).  Geometry comes from
+    `arc_cache` when one is given, with vertices every `segment_km`.
+    """
+    airports = get_registry() if airports is None else airports
+    coords, cnts, texts = _known_routes(normalized, airports, labels)
+    texts   = np.append(texts, None)    # arc == -1 on breaks picks this
+    batches = {}
+    for key, idx, lons, lats, arc in _bucket_arcs(coords, cnts, scale_width,
+                                                  arc_cache, segment_km):
+        batches[key] = (lons, lats, texts[np.where(arc >= 0, idx[arc], -1)])
+    return batches
+
+
+def _add_routes(fig, trace_cls, normalized, route_color, scale_width, airports,
+                arc_cache, lod):
+    lod = lod or {}
+    with diagnostics.stage("route batches"):
+        batches = route_batches(lod.get("routes", normalized), scale_width, airports,
+                                arc_cache, lod.get("labels"),
+                                lod.get("segment_km", ARC_SEGMENT_KM))
+    with diagnostics.stage("traces"):
+        for key in sorted(batches):
+            lons, lats, texts = batches[key]
+            width, opacity = route_style(key, scale_width)
+            fig.add_trace(trace_cls(
+                lon=lons, lat=lats, mode="lines",
+                line=dict(width=width, color=route_color),
+                opacity=opacity,
+                hoverinfo="text",
+                text=texts,
+                showlegend=False,
+            ))
+            diagnostics.count("traces")
+            diagnostics.count("points", lons.size)
+
+
+def add_routes_geo(fig, normalized, route_color, scale_width, airports=None,
+                   arc_cache=None, lod=None):
+    """
+    Add batched Scattergeo route traces (Globe or Flat mode).
+
+    `lod`, an `apply_lod` result, replaces the routes, labels and density.
+    """
+    _add_routes(fig, go.Scattergeo, normalized, route_color, scale_width, airports,
+                arc_cache, lod)
+
+
+def add_routes_mapbox(fig, normalized, route_color, scale_width, airports=None,
+                      arc_cache=None, lod=None):
+    """Add batched Scattermapbox route traces (Satellite mode); see add_routes_geo."""
+    _add_routes(fig, go.Scattermapbox, normalized, route_color, scale_width, airports,
+                arc_cache, lod)
+
+
+def airport_points(visits, airports=None) -> dict:
+    """
+    Arrays for the airport marker layer: lon, lat, size, code and hover
+    text of every visited airport the registry knows.
+    """
+    airports = get_registry() if airports is None else airports
+    codes = np.array(list(visits), dtype=object)
+    cnts  = np.fromiter(visits.values(), dtype=np.int64, count=len(visits))
+    rows  = airports.rows(codes)
+    ok    = rows >= 0
+    codes, cnts, rows = codes[ok], cnts[ok], rows[ok]
+    hover = ("<b>" + codes + "</b> – " + airports.name[rows]
+             + "<br>Visited " + cnts.astype(str).astype(object) + "×")
+    return dict(lon=airports.lon[rows], lat=airports.lat[rows],
+                size=marker_size(cnts), code=codes, hover=hover)
+
+
+def _add_airports(fig, trace_cls, stats, route_color, show_labels, airports):
+    with diagnostics.stage("airports"):
+        pts = airport_points(stats["visits"], airports)
+        fig.add_trace(trace_cls(
+            lon=pts["lon"], lat=pts["lat"],
+            mode="markers+text" if show_labels else "markers",
+            marker=dict(size=pts["size"], color=route_color, opacity=0.85),
+            text=pts["code"] if show_labels else None,
+            textposition="top right",
+            textfont=dict(color="white", size=9),
+            hovertext=pts["hover"],
+            hoverinfo="text",
+            showlegend=False,
+        ))
+    diagnostics.count("traces")
+    diagnostics.count("points", pts["lon"].size)
+
+
+def add_airports_geo(fig, stats, route_color, show_labels, airports=None):
+    """Add all Scattergeo airport markers as one trace."""
+    _add_airports(fig, go.Scattergeo, stats, route_color, show_labels, airports)
+
+
+def add_airports_mapbox(fig, stats, route_color, show_labels, airports=None):
+    """Add all Scattermapbox airport markers as one trace."""
+    _add_airports(fig, go.Scattermapbox, stats, route_color, show_labels, airports)
+
+
+# ── High-volume Satellite backend ─────────────────────────────────────────────
+# Routes become mapbox-gl GeoJSON line layers, drawn on the GPU by the map
+# itself instead of as Plotly trace points.  Each layer's GeoJSON is
+# serialized once here and handed over as a data: URL, so Plotly never
+# validates or re-encodes millions of nested coordinate lists; coordinates
+# are rounded to GL_DECIMALS places (~10 m).
+GL_DECIMALS = 4
+
+
+def _geojson_lines(lons, lats) -> str:
+    """NaN-separated arrays → data: URL of one GeoJSON MultiLineString."""
+    xy    = np.round(np.column_stack([lons, lats]), GL_DECIMALS)
+    parts = np.split(xy, np.flatnonzero(np.isnan(lons)))
+    lines = [parts[0]] + [p[1:] for p in parts[1:]]     # drop the NaN rows
+    feature = {"type": "Feature", "properties": {},
+               "geometry": {"type": "MultiLineString",
+                            "coordinates": [ln.tolist() for ln in lines if len(ln) > 1]}}
+    return "data:application/json," + quote(
+        json.dumps(feature, separators=(",", ":")), safe='[]{}:,."-')
+
+
+def add_routes_mapbox_gl(fig, normalized, route_color, scale_width, airports=None,
+                         arc_cache=None, lod=None) -> list[dict]:
+    """
+    Add high-volume Satellite routes; returns the `layout.mapbox.layers` to
+    append after the basemap.
+
+    One GeoJSON line layer per frequency bucket carries the geometry.  Map
+    layers have no hover, so route labels ride on a single transparent
+    marker trace at the arc midpoints.
+    """
+    airports = get_registry() if airports is None else airports
+    lod      = lod or {}
+    coords, cnts, texts = _known_routes(lod.get("routes", normalized), airports,
+                                        lod.get("labels"))
+    layers = []
+    for key, _, lons, lats, _ in _bucket_arcs(coords, cnts, scale_width, arc_cache,
+                                              lod.get("segment_km", ARC_SEGMENT_KM)):
+        width, opacity = route_style(key, scale_width)
+        with diagnostics.stage("gl layers"):
+            source = _geojson_lines(lons, lats)
+        diagnostics.count("layers")
+        diagnostics.count("points", lons.size)
+        diagnostics.count("layer bytes", len(source))
+        layers.append(dict(
+            sourcetype="geojson", source=source,
+            type="line", color=route_color, opacity=opacity,
+            line=dict(width=width), below="traces",
+        ))
+    mid_lon, mid_lat = arc_midpoints(*coords.T)
+    diagnostics.count("traces")
+    diagnostics.count("points", mid_lon.size)
+    fig.add_trace(go.Scattermapbox(
+        lon=np.round(mid_lon, GL_DECIMALS), lat=np.round(mid_lat, GL_DECIMALS),
+        mode="markers", marker=dict(size=10, opacity=0),
+        hoverinfo="text", text=texts, showlegend=False,
+    ))
+    return layers
+
@@ -0,0 +1,95 @@
+"""
+Per-flight route log, served a page at a time.
+
+`RouteLog` keeps only vectorized columns over a `RouteTable` — the
+integer origin/destination ids it already has plus one float32 distance
+per flight — and does filtering and sorting on those.  Strings (codes,
+airport names, formatted distances) are built for the requested page
+only, so memory stays proportional to the log, not to its text.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .airports import get_registry
+
+SORT_KEYS = ("flight", "origin", "destination", "distance")
+
+
+class RouteLog:
+    """
+    Filterable, sortable view of a flight log.
+
+    `query` returns the matching flight indices in display order (the last
+    query is memoized, so paging through it is free); `page` formats one
+    slice of them as a DataFrame.
+    """
+
+    def __init__(self, routes, airports=None, distances=None):
+        self.routes   = routes
+        self.airports = get_registry() if airports is None else airports
+        self._rows    = self.airports.rows(routes.codes)     # registry row per code
+        self.km       = routes.flight_km(self.airports, distances)
+        self._last    = (None, None)
+
+    def __len__(self):
+        return len(self.routes)
+
+    def _code_id(self, code: str) -> int:
+        """Id of `code` in the table's sorted codes, or -1."""
+        i = int(np.searchsorted(self.routes.codes, code))
+        return i if i < self.routes.codes.size and self.routes.codes[i] == code else -1
+
+    def query(self, origin=None, dest=None, min_km=None, max_km=None,
+              sort="flight", descending=False) -> np.ndarray:
+        """
+        Indices of flights matching every given filter, sorted by `sort`
+        (one of SORT_KEYS).  Flights with an unknown airport have no
+        distance and drop out of any distance filter.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {sort!r}; expected one of {SORT_KEYS}")
+        key = (origin, dest, min_km, max_km, sort, descending)
+        last_key, last_idx = self._last
+        if key == last_key:
+            return last_idx
+
+        keep = np.ones(len(self), dtype=bool)
+        if origin is not None:
+            keep &= self.routes.origin == self._code_id(origin)
+        if dest is not None:
+            keep &= self.routes.dest == self._code_id(dest)
+        if min_km is not None:
+            keep &= self.km >= min_km
+        if max_km is not None:
+            keep &= self.km <= max_km
+        idx = np.flatnonzero(keep)
+
+        # Codes are sorted, so ordering by id orders by code
+        column = {"origin": self.routes.origin, "destination": self.routes.dest,
+                  "distance": self.km}.get(sort)
+        if column is not None:
+            idx = idx[np.argsort(column[idx], kind="stable")]
+        if descending:
+            idx = idx[::-1]
+        self._last = (key, idx)
+        return idx
+
+    def page(self, idx, page: int = 0, page_size: int = 100) -> pd.DataFrame:
+        """Rows `page * page_size` onwards of `idx`, formatted for display."""
+        sel    = idx[page * page_size:(page + 1) * page_size]
+        o, d   = self.routes.origin[sel], self.routes.dest[sel]
+        ro, rd = self._rows[o], self._rows[d]
+        km     = self.km[sel]
+        df     = pd.DataFrame({
+            "#":             sel + 1,
+            "Origin":        self.routes.codes[o],
+            "Origin Name":   np.where(ro >= 0, self.airports.name[ro], "—"),
+            "Dest":          self.routes.codes[d],
+            "Dest Name":     np.where(rd >= 0, self.airports.name[rd], "—"),
+            "Distance (km)": [f"{v:,.0f}" if v > 0 else "—" for v in km.tolist()],
+        })
+        if self.routes.time is not None:
+            df.insert(1, "Date", pd.Series(self.routes.time[sel]).dt.strftime("%Y-%m-%d %H:%M")
+                      .str.removesuffix(" 00:00").fillna("—"))
+        return df
@@ -0,0 +1,151 @@
+"""
+Flight-log statistics.
+
+Everything is derived from direction-agnostic route counts, so the same
+code serves a full `RouteTable` and a streamed log: distances come from
+the shared `DistanceService`, once per distinct pair, weighted by its
+flight count.
+
+`StatsAggregator` keeps those numbers as running state so a growing log can
+be updated with just its new (or retracted) flights.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .airports import get_registry
+from .distance import get_distances
+
+
+def stats_from_route_counts(route_counts: Counter, airports=None) -> dict:
+    """Headline stats for {(a, b): flights}."""
+    airports = get_registry() if airports is None else airports
+    pairs    = np.array(list(route_counts), dtype=object).reshape(-1, 2)
+    cnts     = np.fromiter(route_counts.values(), dtype=np.int64,
+                           count=len(route_counts))
+
+    ids, codes = pd.factorize(pairs.T.ravel(), sort=True)
+    per_code   = np.bincount(ids, weights=np.tile(cnts, 2), minlength=codes.size)
+    visits     = Counter(dict(zip(codes.tolist(), per_code.astype(np.int64).tolist())))
+
+    rows     = airports.rows(codes)
+    a, b     = ids[:len(cnts)], ids[len(cnts):]
+    km       = get_distances(airports).rows_km(rows[a], rows[b])
+    total_km = float(np.nansum(km * cnts))
+
+    regions  = sorted(set(airports.region_of(rows[rows >= 0])))
+    missing  = sorted(codes[rows < 0].tolist())
+    return dict(n_flights=int(cnts.sum()), n_airports=len(visits),
+                total_km=total_km, n_regions=len(regions),
+                regions=regions, visits=visits, missing=missing)
+
+
+def compute_stats(routes, airports=None) -> dict:
+    """Headline stats for a `RouteTable`."""
+    return stats_from_route_counts(routes.route_counts(), airports)
+
+
+def _route_delta(routes) -> Counter:
+    """Direction-agnostic counts of a `RouteTable` or iterable of (o, d)."""
+    if hasattr(routes, "route_counts"):
+        return routes.route_counts()
+    return Counter(tuple(sorted(pair)) for pair in routes)
+
+
+class StatsAggregator:
+    """
+    Incrementally maintained `compute_stats`.
+
+    `add` / `remove` cost time proportional to the number of distinct
+    routes in the delta; `stats()` returns the `compute_stats` fields plus
+    `routes`, the per-route flight counts.
+    """
+
+    def __init__(self, airports=None):
+        self.airports     = get_registry() if airports is None else airports
+        self.route_counts = Counter()
+        self.visits       = Counter()
+        self.n_flights    = 0
+        self.total_km     = 0.0
+        self._km          = {}          # route → km (NaN if an end is unknown)
+        self._regions     = Counter()   # region → visited airports in it
+        self._missing     = set()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, airports=None) -> "StatsAggregator":
+        agg = cls(airports)
+        agg.update(Counter({(a, b): n for a, b, n in snapshot["route_counts"]}))
+        return agg
+
+    def snapshot(self) -> dict:
+        """JSON-serializable state; `from_snapshot` restores it."""
+        return dict(route_counts=[[a, b, n] for (a, b), n in self.route_counts.items()])
+
+    def add(self, routes) -> "StatsAggregator":
+        return self.update(_route_delta(routes))
+
+    def remove(self, routes) -> "StatsAggregator":
+        return self.update(Counter({k: -n for k, n in _route_delta(routes).items()}))
+
+    def update(self, delta: Counter) -> "StatsAggregator":
+        """Apply signed per-route flight counts {(a, b): ±n} with a <= b."""
+        for pair, n in delta.items():
+            if self.route_counts[pair] + n < 0:
+                raise ValueError(f"cannot remove {-n} × {pair}: only "
+                                 f"{self.route_counts[pair]} recorded")
+        self._measure([p for p in delta if p not in self._km])
+
+        for (a, b), n in delta.items():
+            if n == 0:
+                continue
+            left = self.route_counts[a, b] + n
+            if left:
+                self.route_counts[a, b] = left
+            else:
+                del self.route_counts[a, b]
+            self.n_flights += n
+            km = self._km[a, b]
+            if km == km:
+                self.total_km += km * n
+            self._visit(a, n)
+            self._visit(b, n)
+        if not self.n_flights:
+            self.total_km = 0.0     # drop accumulated rounding error
+        return self
+
+    def _measure(self, pairs):
+        """Distances for routes seen for the first time, in one batch."""
+        if not pairs:
+            return
+        a, b = np.array(pairs, dtype=object).reshape(-1, 2).T
+        km   = get_distances(self.airports).km(a, b)
+        self._km.update(zip(pairs, km.tolist()))
+
+    def _visit(self, code, n):
+        before = self.visits[code]
+        after  = before + n
+        if after:
+            self.visits[code] = after
+        else:
+            del self.visits[code]
+        if bool(before) == bool(after):
+            return
+        step = 1 if after else -1
+        row  = self.airports.row(code)
+        if row < 0:
+            (self._missing.add if after else self._missing.discard)(code)
+        else:
+            region = str(self.airports.region_of(row))
+            self._regions[region] += step
+            if not self._regions[region]:
+                del self._regions[region]
+
+    def stats(self) -> dict:
+        regions = sorted(self._regions)
+        return dict(n_flights=self.n_flights, n_airports=len(self.visits),
+                    total_km=self.total_km, n_regions=len(regions),
+                    regions=regions, visits=Counter(self.visits),
+                    missing=sorted(self._missing),
+                    routes=Counter(self.route_counts))
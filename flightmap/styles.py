@@ -0,0 +1,62 @@
+"""
+Visual themes and initial-view presets.
+
+Plain data with no third-party imports, so the app can draw its sidebar
+before the plotting stack has loaded.
+"""
+
+# ── Visual themes ─────────────────────────────────────────────────────────────
+GLOBE_STYLES = {
+    "🌿 Natural":  dict(land="rgb(55,105,55)",    ocean="rgb(20,70,130)",
+                        bg="rgb(10,30,60)",        coast="rgba(180,220,180,0.6)",
+                        country="rgba(180,210,180,0.3)"),
+    "🌑 Dark":     dict(land="rgb(35,35,35)",      ocean="rgb(12,22,45)",
+                        bg="rgb(5,5,15)",           coast="rgba(120,120,120,0.6)",
+                        country="rgba(80,80,80,0.4)"),
+    "🏜️ Sandy":   dict(land="rgb(195,165,110)",   ocean="rgb(75,140,195)",
+                        bg="rgb(55,110,165)",       coast="rgba(220,200,160,0.6)",
+                        country="rgba(160,140,100,0.4)"),
+    "🧊 Ice":      dict(land="rgb(215,228,240)",   ocean="rgb(145,195,230)",
+                        bg="rgb(175,210,235)",      coast="rgba(80,130,170,0.6)",
+                        country="rgba(100,130,160,0.3)"),
+}
+
+# Flat map uses same color dicts but with natural-earth projection
+FLAT_STYLES = GLOBE_STYLES  # reuse themes
+
+COLOR_THEMES = {
+    "Crimson Red":  "#DC143C",
+    "Royal Blue":   "#3A7BD5",
+    "Amber Gold":   "#FFC107",
+    "Emerald":      "#2ECC71",
+    "Neon Orange":  "#FF6600",
+    "Violet":       "#7B2FBE",
+    "Ice Blue":     "#00BFFF",
+    "Coral":        "#FF6B6B",
+}
+
+# Satellite tile (Esri World Imagery – free, no API key)
+ESRI_SAT = ("https://server.arcgisonline.com/ArcGIS/rest/services/"
+            "World_Imagery/MapServer/tile/{z}/{y}/{x}")
+
+# ── Presets ───────────────────────────────────────────────────────────────────
+MODES   = ("globe", "flat", "satellite")
+REGIONS = ("Asia-Pacific", "North America", "Europe", "World")
+
+# Globe / Flat: rotation center for Scattergeo projection
+GEO_ROTATION = {
+    "Asia-Pacific":  dict(lon=160, lat=15),
+    "North America": dict(lon=-95, lat=40),
+    "Europe":        dict(lon=15,  lat=50),
+    "World":         dict(lon=160, lat=15),   # Pacific-centric world view
+}
+# Satellite: Mapbox center + zoom
+# Asia-Pacific center is set near the antimeridian (lon=-175) so that
+# BOTH the Asian side (positive lons) and the American side (negative lons)
+# are inside the same viewport – eliminating the Pacific gap for Scattermapbox.
+SAT_VIEW = {
+    "Asia-Pacific":  dict(lat=25,  lon=-175, zoom=1.6),
+    "North America": dict(lat=40,  lon=-100, zoom=2.8),
+    "Europe":        dict(lat=50,  lon=10,   zoom=3.0),
+    "World":         dict(lat=15,  lon=-175, zoom=1.2),
+}
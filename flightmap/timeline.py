@@ -0,0 +1,162 @@
+"""
+Time-indexed flight store.
+
+`RouteTimeline` keeps the dated flights of a `RouteTable` sorted by time,
+so a date range is two binary searches and a slice, and per-period figures
+come from one grouped pass over the sorted columns instead of a
+`compute_stats` call per period:
+
+  window        flights in [start, end) as another timeline (views, no copy)
+  periods       calendar periods spanned, and the offset where each starts
+  period_stats  flights, km, airports and routes per period, with first-seen
+                and running totals
+  new_routes    routes first flown in each period: one animation frame's
+                worth of new arcs
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .airports import get_registry
+from .ingest import RouteTable
+
+# Period label → pandas period alias
+PERIODS = {"Day": "D", "Week": "W", "Month": "M", "Quarter": "Q", "Year": "Y"}
+
+
+class RouteTimeline:
+    """
+    Dated flights in time order.
+
+    `routes` is a `RouteTable` whose rows are sorted by `routes.time`;
+    flights without a date are left out and counted in `undated`.
+    """
+
+    def __init__(self, routes, airports=None):
+        if routes.time is None:
+            raise ValueError("Flight log has no date column")
+        dated = np.flatnonzero(~np.isnat(routes.time))
+        order = dated[np.argsort(routes.time[dated], kind="stable")]
+        self.routes   = RouteTable(routes.codes, routes.origin[order], routes.dest[order],
+                                   routes.time[order])
+        self.undated  = len(routes) - dated.size
+        self.airports = get_registry() if airports is None else airports
+        self._km      = None
+
+    @classmethod
+    def _view(cls, parent, lo, hi) -> "RouteTimeline":
+        r    = parent.routes
+        view = cls.__new__(cls)
+        view.routes   = RouteTable(r.codes, r.origin[lo:hi], r.dest[lo:hi], r.time[lo:hi])
+        view.undated  = 0
+        view.airports = parent.airports
+        view._km      = None if parent._km is None else parent._km[lo:hi]
+        return view
+
+    def __len__(self):
+        return len(self.routes)
+
+    @property
+    def start(self):
+        return pd.Timestamp(self.routes.time[0]) if len(self) else None
+
+    @property
+    def end(self):
+        return pd.Timestamp(self.routes.time[-1]) if len(self) else None
+
+    @property
+    def km(self) -> np.ndarray:
+        """Distance per flight, computed on first use."""
+        if self._km is None:
+            self._km = self.routes.flight_km(self.airports)
+        return self._km
+
+    def window(self, start=None, end=None) -> "RouteTimeline":
+        """Flights with start <= time < end (either bound optional)."""
+        t  = self.routes.time
+        lo = 0 if start is None else np.searchsorted(t, pd.Timestamp(start).to_datetime64())
+        hi = len(self) if end is None else np.searchsorted(t, pd.Timestamp(end).to_datetime64())
+        return self._view(self, int(lo), int(max(lo, hi)))
+
+    def periods(self, freq: str = "M") -> tuple[pd.PeriodIndex, np.ndarray]:
+        """
+        Every period from the first flight's to the last's, and the offsets
+        bounding each period's flights (one longer than the periods).
+        """
+        if not len(self):
+            return pd.PeriodIndex([], freq=freq), np.zeros(1, dtype=np.int64)
+        periods = pd.period_range(self.start, self.end, freq=freq)
+        starts  = np.searchsorted(self.routes.time,
+                                  periods.start_time.to_numpy("datetime64[ns]"))
+        return periods, np.append(starts, len(self)).astype(np.int64)
+
+    def _period_ids(self, bounds) -> np.ndarray:
+        return np.repeat(np.arange(bounds.size - 1), np.diff(bounds))
+
+    def _route_ids(self) -> np.ndarray:
+        """Direction-agnostic route id per flight, numbered by first flight."""
+        r   = self.routes
+        key = np.minimum(r.origin, r.dest).astype(np.int64) * r.codes.size
+        return pd.factorize(key + np.maximum(r.origin, r.dest))[0]
+
+    def period_stats(self, freq: str = "M") -> pd.DataFrame:
+        """
+        Per period: flights, km, distinct airports and routes, airports and
+        routes seen for the first time, and running totals of each.
+        """
+        periods, bounds = self.periods(freq)
+        n_p = len(periods)
+        pid = self._period_ids(bounds)
+        r   = self.routes
+
+        # Hash-based throughout: no sort over every flight
+        def distinct(ids, pids, k):
+            return np.bincount(pd.unique(pids * k + ids) // k, minlength=n_p)
+
+        def first_seen(ids, pids):
+            return np.bincount(pids[_first_seen(ids)], minlength=n_p)
+
+        # Airport ids renumbered by first appearance, like the route ids
+        stops  = pd.factorize(np.column_stack([r.origin, r.dest]).ravel())[0]
+        routes = self._route_ids()
+        k_r    = int(routes.max()) + 1 if routes.size else 1
+        df = pd.DataFrame({
+            "flights":      np.diff(bounds),
+            "km":           np.bincount(pid, weights=np.nan_to_num(self.km), minlength=n_p),
+            "airports":     distinct(stops, np.repeat(pid, 2), max(r.codes.size, 1)),
+            "routes":       distinct(routes, pid, k_r),
+            "new_airports": first_seen(stops, np.repeat(pid, 2)),
+            "new_routes":   first_seen(routes, pid),
+        }, index=pd.Index(periods, name="period"))
+        for col in ("flights", "km", "new_airports", "new_routes"):
+            df[f"total_{col.removeprefix('new_')}"] = df[col].cumsum()
+        return df
+
+    def new_routes(self, freq: str = "M") -> tuple[pd.PeriodIndex, list[Counter]]:
+        """
+        Per period, {(a, b): flights this period} of the routes first flown
+        in it, keyed like `RouteTable.route_counts`.
+        """
+        periods, bounds = self.periods(freq)
+        pid    = self._period_ids(bounds)
+        routes = self._route_ids()
+        born   = pid[_first_seen(routes)][routes]   # period each flight's route first appears
+        r      = self.routes
+        out    = []
+        for p, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+            sel  = np.arange(lo, hi)[born[lo:hi] == p]
+            out.append(RouteTable(r.codes, r.origin[sel], r.dest[sel]).route_counts())
+        return periods, out
+
+
+def _first_seen(ids) -> np.ndarray:
+    """
+    Mask of first occurrences in `ids`, which must number values by first
+    appearance (as `pd.factorize` does): each new value is one more than
+    every id before it.
+    """
+    new = np.ones(ids.size, dtype=bool)
+    new[1:] = ids[1:] > np.maximum.accumulate(ids)[:-1]
+    return new
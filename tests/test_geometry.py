@@ -0,0 +1,59 @@
+"""great_circle_arcs: antimeridian handling at every LOD segment length."""
+
+import numpy as np
+import pytest
+
+from flightmap.cache import ArcCache
+from flightmap.geometry import great_circle_arcs
+
+# Fiji → Samoa-ish: crosses ±180 in the South Pacific
+ROUTE = (175.0, -18.0, -170.0, -14.0)
+
+
+def pieces(lons, lats):
+    """The NaN-separated runs of one arc, as (lons, lats) pairs."""
+    cut = np.flatnonzero(np.isnan(lons))
+    return [(lo, la) for lo, la in zip(np.split(lons, cut), np.split(lats, cut))]
+
+
+def crossing_lat(route, segment_km):
+    lons, lats, _ = great_circle_arcs(*route, segment_km=segment_km)
+    (lo1, la1), (lo2, la2) = pieces(lons, lats)
+    lo2, la2 = lo2[1:], la2[1:]           # drop the NaN
+    assert abs(lo1[-1]) == 180 and lo2[0] == -lo1[-1]
+    assert la1[-1] == la2[0]
+    return la1[-1]
+
+
+@pytest.mark.parametrize("segment_km", [100, 512, 1024, 4096])
+def test_coarse_arcs_reach_the_antimeridian_on_both_sides(segment_km):
+    dense = crossing_lat(ROUTE, 10)
+    assert crossing_lat(ROUTE, segment_km) == pytest.approx(dense, abs=0.01)
+
+
+def test_eastbound_and_westbound_cross_at_the_same_point():
+    back = (ROUTE[2], ROUTE[3], ROUTE[0], ROUTE[1])
+    assert crossing_lat(back, 1024) == pytest.approx(crossing_lat(ROUTE, 1024), abs=1e-9)
+    lons, lats, _ = great_circle_arcs(*back, segment_km=1024)
+    assert pieces(lons, lats)[0][0][-1] == -180           # leaves westward
+
+
+def test_no_jump_left_and_endpoints_pinned():
+    rng = np.random.default_rng(0)
+    lon1, lon2 = rng.uniform(-180, 180, (2, 500))
+    lat1, lat2 = rng.uniform(-70, 70, (2, 500))
+    lons, lats, arc = great_circle_arcs(lon1, lat1, lon2, lat2, segment_km=1024)
+    assert np.all(np.isnan(lons) == (arc < 0))
+    assert not np.any(np.abs(np.diff(lons)) > 180)      # NaN compares False
+    for i in (0, 137, 499):
+        idx = np.flatnonzero(arc == i)
+        assert (lons[idx[0]], lats[idx[0]]) == (lon1[i], lat1[i])
+        assert (lons[idx[-1]], lats[idx[-1]]) == (lon2[i], lat2[i])
+
+
+def test_arc_cache_matches_direct_computation():
+    a = np.array([[*ROUTE], [0.0, 0.0, 10.0, 10.0]]).T
+    direct = great_circle_arcs(*a, segment_km=1024)
+    cached = ArcCache().arcs(*a, segment_km=1024)
+    for x, y in zip(direct, cached):
+        np.testing.assert_array_equal(x, y)
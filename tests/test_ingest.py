@@ -0,0 +1,82 @@
+"""Merging several uploaded logs: RouteTable.merge and read_many."""
+
+from collections import Counter
+
+import numpy as np
+
+from flightmap.cache import LogCache
+from flightmap.ingest import RouteTable, read_many, read_routes
+
+HEADER = b"origin,destination,date\n"
+
+
+def log(*rows) -> bytes:
+    return HEADER + "".join(f"{o},{d},{t}\n" for o, d, t in rows).encode()
+
+
+def records(table) -> Counter:
+    """(origin, destination, date or None) → flights."""
+    times = [None if np.isnat(t) else str(t)[:10] for t in table.time]
+    return Counter(zip(table.codes[table.origin].tolist(),
+                       table.codes[table.dest].tolist(), times))
+
+
+def test_single_file_keeps_same_day_repeats():
+    data   = log(("HKG", "SFO", "2023-01-05"), ("HKG", "SFO", "2023-01-05"),
+                 ("SFO", "AUS", "2023-01-05"))
+    merged = RouteTable.merge([read_routes(data)])
+    assert len(merged) == 3
+    table, report = read_many([data])
+    assert len(table) == 3 and report["duplicates"] == 0
+
+
+def test_repeats_across_files_keep_the_per_file_maximum():
+    a = log(("HKG", "SFO", "2023-01-05"), ("HKG", "SFO", "2023-01-05"),
+            ("SFO", "AUS", "2023-01-07"))
+    b = log(("HKG", "SFO", "2023-01-05"), ("HKG", "SFO", "2023-01-05"),
+            ("HKG", "SFO", "2023-01-05"), ("AUS", "OAK", "2023-02-01"))
+    c = log(("SFO", "AUS", "2023-01-07"))
+    table, report = read_many([a, b, c])
+    assert records(table) == Counter({("HKG", "SFO", "2023-01-05"): 3,
+                                      ("SFO", "AUS", "2023-01-07"): 1,
+                                      ("AUS", "OAK", "2023-02-01"): 1})
+    assert report["duplicates"] == 8 - 5
+
+
+def test_undated_rows_are_kept():
+    a = log(("HKG", "SFO", ""), ("HKG", "SFO", ""), ("SFO", "AUS", "2023-01-07"))
+    b = log(("HKG", "SFO", ""), ("SFO", "AUS", "2023-01-07"))
+    c = b"origin,destination\nHKG,SFO\n"                  # no date column at all
+    table, _ = read_many([a, b, c])
+    assert records(table) == Counter({("HKG", "SFO", None): 4,
+                                      ("SFO", "AUS", "2023-01-07"): 1})
+
+
+def test_identical_files_count_once_and_are_cached():
+    a, b  = log(("HKG", "SFO", "2023-01-05")), log(("SFO", "AUS", "2023-01-07"))
+    cache = LogCache()
+    table, report = read_many([a, b, a], cache=cache)
+    assert len(table) == 2 and report["parsed"] == 2
+    _, report = read_many([b, a], cache=cache)
+    assert (report["parsed"], report["cached"]) == (0, 2)
+
+
+def test_failed_file_is_reported_and_skipped():
+    good  = log(("HKG", "SFO", "2023-01-05"))
+    table, report = read_many([b"foo,bar\n1,2\n", good])
+    assert len(table) == 1 and list(report["errors"]) == [0]
+
+
+def test_log_cache_is_bounded_by_bytes():
+    tables = [read_routes(log(*[("HKG", "SFO", f"2023-01-{d:02d}")] * 100))
+              for d in range(1, 6)]
+    cache  = LogCache(max_bytes=1)               # too small for any table
+    cache.put("a", tables[0])
+    assert len(cache) == 0 and cache.nbytes == 0
+    probe = LogCache()
+    probe.put("a", tables[0])
+    cache = LogCache(max_bytes=3 * probe.nbytes)
+    for i, t in enumerate(tables):
+        cache.put(str(i), t)
+    assert len(cache) == 3 and cache.nbytes <= cache.max_bytes
+    assert "0" not in cache and "4" in cache
@@ -0,0 +1,160 @@
+"""RouteNetwork against brute-force BFS, Brandes and Dijkstra references."""
+
+import heapq
+import random
+from collections import Counter, deque
+
+import numpy as np
+import pytest
+
+from flightmap.airports import AirportRegistry
+from flightmap.distance import DistanceService
+from flightmap.network import RouteNetwork
+
+
+def random_network(seed: int, n: int = 40, n_routes: int = 70):
+    """Airports spread over the globe in three regions, plus an unknown one."""
+    rng   = random.Random(seed)
+    table = {f"A{i:03d}": (rng.uniform(-180, 180), rng.uniform(-75, 75), f"n{i}",
+                           rng.choice("XYZ")) for i in range(n)}
+    airports = AirportRegistry.from_mapping(table)
+    counts   = Counter()
+    for _ in range(n_routes):
+        a, b = rng.sample(sorted(table), 2)
+        counts[tuple(sorted((a, b)))] += rng.randint(1, 5)
+    counts["A000", "QQQ"] = 3            # not in the registry: left out
+    return RouteNetwork.from_route_counts(counts, airports, DistanceService(airports)), counts
+
+
+def adjacency(net):
+    adj = [[] for _ in range(len(net))]
+    for a, b, km in zip(net.edge_a.tolist(), net.edge_b.tolist(), net.edge_km.tolist()):
+        adj[a].append((b, km))
+        adj[b].append((a, km))
+    return adj
+
+
+def brandes(adj):
+    """Textbook Brandes betweenness on an unweighted, undirected graph."""
+    n, bc = len(adj), [0.0] * len(adj)
+    for s in range(n):
+        order, preds = [], [[] for _ in range(n)]
+        sigma, depth = [0] * n, [-1] * n
+        sigma[s], depth[s] = 1, 0
+        queue = deque([s])
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            for w, _ in adj[v]:
+                if depth[w] < 0:
+                    depth[w] = depth[v] + 1
+                    queue.append(w)
+                if depth[w] == depth[v] + 1:
+                    sigma[w] += sigma[v]
+                    preds[w].append(v)
+        delta = [0.0] * n
+        for w in reversed(order):
+            for v in preds[w]:
+                delta[v] += sigma[v] / sigma[w] * (1 + delta[w])
+            if w != s:
+                bc[w] += delta[w]
+    return [x / 2 for x in bc]
+
+
+def dijkstra(adj, s, t):
+    dist, heap = {s: 0.0}, [(0.0, s)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u == t:
+            return d
+        if d > dist[u]:
+            continue
+        for v, km in adj[u]:
+            if d + km < dist.get(v, np.inf):
+                dist[v] = d + km
+                heapq.heappush(heap, (d + km, v))
+    return None
+
+
+def bfs_components(adj, inside):
+    seen, out = set(), []
+    for i in range(len(adj)):
+        if inside[i] and i not in seen:
+            group, stack = [], [i]
+            seen.add(i)
+            while stack:
+                u = stack.pop()
+                group.append(u)
+                for v, _ in adj[u]:
+                    if inside[v] and v not in seen:
+                        seen.add(v)
+                        stack.append(v)
+            out.append(sorted(group))
+    return sorted(out)
+
+
+SEEDS = range(4)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_csr_matches_edge_list(seed):
+    net, counts = random_network(seed)
+    assert "QQQ" not in net.codes.tolist()
+    adj = adjacency(net)
+    for u in range(len(net)):
+        lo, hi = net.indptr[u], net.indptr[u + 1]
+        assert sorted(zip(net.indices[lo:hi].tolist(), net.km[lo:hi].tolist())) == sorted(adj[u])
+    flights = Counter()
+    for (a, b), n in counts.items():
+        if "QQQ" not in (a, b):
+            flights[a] += n
+            flights[b] += n
+    assert dict(zip(net.codes.tolist(), net.flights().tolist())) == flights
+    assert net.degree().tolist() == [len(x) for x in adj]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_betweenness_matches_brandes(seed):
+    net, _ = random_network(seed)
+    np.testing.assert_allclose(net.betweenness(samples=len(net)), brandes(adjacency(net)))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_components_match_bfs(seed):
+    net, _ = random_network(seed)
+    adj = adjacency(net)
+    for region in (None, "X", "Y", "Z"):
+        inside = [region is None or r == region for r in net.region.tolist()]
+        got    = sorted(sorted(net.node(c) for c in group) for group in net.components(region))
+        assert got == bfs_components(adj, inside), region
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_shortest_path_matches_dijkstra(seed):
+    net, _ = random_network(seed)
+    adj  = adjacency(net)
+    legs = {(a, b): km for a, nbrs in enumerate(adj) for b, km in nbrs}
+    rng  = random.Random(seed)
+    for _ in range(60):
+        a, b = rng.sample(net.codes.tolist(), 2)
+        got  = net.shortest_path(a, b)
+        ref  = dijkstra(adj, net.node(a), net.node(b))
+        assert (got is None) == (ref is None)
+        if got is not None:
+            assert got["km"] == pytest.approx(ref, rel=1e-12)
+            path = [net.node(c) for c in got["path"]]
+            assert (path[0], path[-1]) == (net.node(a), net.node(b))
+            assert got["hops"] == len(path) - 1
+            assert sum(legs[u, v] for u, v in zip(path, path[1:])) == pytest.approx(got["km"])
+
+
+@pytest.mark.parametrize("counts", [Counter(), Counter({("QQQ", "ZZZ"): 2, ("YYY", "ZZZ"): 1})])
+def test_empty_network(counts):
+    airports = AirportRegistry.from_mapping({"A000": (0.0, 0.0, "n0", "X")})
+    net = RouteNetwork.from_route_counts(counts, airports, DistanceService(airports))
+    assert (len(net), net.n_edges) == (0, 0)
+    assert net.hubs(10, "betweenness") == []
+    assert net.components() == [] and net.region_summary() == []
+    for code in ("ZZZ", None):
+        with pytest.raises(ValueError):
+            net.node(code)
@@ -0,0 +1,75 @@
+"""StatsAggregator: incremental updates must equal a full compute_stats."""
+
+import json
+
+import pytest
+
+from benchmarks.bench_stats import synthetic_log
+from flightmap.ingest import RouteTable
+from flightmap.stats import StatsAggregator, compute_stats
+
+
+def assert_matches_full(stats: dict, flights):
+    table = RouteTable.from_pairs(flights)
+    full  = dict(compute_stats(table), routes=table.route_counts())
+    assert stats.keys() == full.keys()
+    for key, value in full.items():
+        if key == "total_km":
+            assert stats[key] == pytest.approx(value, rel=1e-9, abs=1e-6)
+        else:
+            assert stats[key] == value, key
+
+
+def test_add_matches_full_recompute():
+    log = synthetic_log(500)
+    agg = StatsAggregator().add(RouteTable.from_pairs(log[:300]))
+    assert_matches_full(agg.stats(), log[:300])
+    for lo in range(300, 500, 50):
+        agg.add(log[lo:lo + 50])
+        assert_matches_full(agg.stats(), log[:lo + 50])
+
+
+def test_remove_matches_full_recompute():
+    log = synthetic_log(400)
+    agg = StatsAggregator().add(log)
+    agg.remove(log[300:])
+    assert_matches_full(agg.stats(), log[:300])
+    agg.remove(RouteTable.from_pairs(log[:300]))
+    stats = agg.stats()
+    assert (stats["n_flights"], stats["total_km"], stats["n_airports"]) == (0, 0.0, 0)
+    assert stats["regions"] == stats["missing"] == []
+    assert not stats["routes"]
+
+
+def test_snapshot_round_trip():
+    log  = synthetic_log(200, seed=1)
+    agg  = StatsAggregator().add(log)
+    snap = json.loads(json.dumps(agg.snapshot()))
+    restored = StatsAggregator.from_snapshot(snap)
+    assert_matches_full(restored.stats(), log)
+    restored.add(log[:10])
+    assert_matches_full(restored.stats(), log + log[:10])
+
+
+def test_unknown_codes_are_missing_and_add_no_distance():
+    known = [("HKG", "SFO"), ("SFO", "HKG")]
+    agg   = StatsAggregator().add(known)
+    km    = agg.stats()["total_km"]
+    agg.add([("HKG", "ZZZ"), ("QQQ", "ZZZ")])
+    stats = agg.stats()
+    assert stats["missing"] == ["QQQ", "ZZZ"]
+    assert stats["total_km"] == km
+    assert stats["n_flights"] == 4
+    agg.remove([("QQQ", "ZZZ")])
+    assert agg.stats()["missing"] == ["ZZZ"]
+    assert_matches_full(agg.stats(), known + [("HKG", "ZZZ")])
+
+
+def test_over_removal_raises_and_leaves_state():
+    log = synthetic_log(50, seed=2)
+    agg = StatsAggregator().add(log)
+    with pytest.raises(ValueError):
+        agg.remove([log[0]] * 51)
+    with pytest.raises(ValueError):
+        agg.remove([("QQQ", "QQQ")])               # never flown
+    assert_matches_full(agg.stats(), log)
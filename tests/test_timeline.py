@@ -0,0 +1,106 @@
+"""RouteTimeline per-period numbers against a naive per-period computation."""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import heavy_tailed
+from flightmap.figure import MAX_FRAMES, build_timeline_figure
+from flightmap.ingest import encode_routes
+from flightmap.stats import compute_stats
+from flightmap.timeline import PERIODS, RouteTimeline
+
+
+@pytest.fixture(scope="module")
+def routes():
+    """3,000 flights over three years, 2 % of them undated."""
+    rng  = np.random.default_rng(1)
+    n    = 3_000
+    o, d = heavy_tailed(n, 3)
+    t    = pd.Timestamp("2021-03-04") + pd.to_timedelta(
+        rng.integers(0, 3 * 365 * 24 * 3600, n), unit="s")
+    t    = t.astype(str).to_numpy(dtype=object)
+    t[rng.random(n) < 0.02] = None
+    return encode_routes(o, d, time=t)
+
+
+@pytest.fixture(scope="module")
+def timeline(routes):
+    return RouteTimeline(routes)
+
+
+def naive(routes, periods, freq):
+    """flights, airports, routes and first-seen counts, one period at a time."""
+    df = pd.DataFrame({"o": routes.codes[routes.origin], "d": routes.codes[routes.dest],
+                       "t": routes.time}).dropna()
+    df["p"] = df.t.dt.to_period(freq)
+    df["r"] = [tuple(sorted(x)) for x in zip(df.o, df.d)]
+    seen_a, seen_r, rows, new = set(), set(), [], []
+    for p in periods:
+        g  = df[df.p == p]
+        ap = set(g.o) | set(g.d)
+        rs = set(g.r)
+        rows.append((len(g), len(ap), len(rs), len(ap - seen_a), len(rs - seen_r)))
+        new.append(Counter(r for r in g.r if r not in seen_r))
+        seen_a |= ap
+        seen_r |= rs
+    cols = ["flights", "airports", "routes", "new_airports", "new_routes"]
+    return pd.DataFrame(rows, columns=cols, index=periods), new
+
+
+def test_undated_flights_left_out(routes, timeline):
+    assert timeline.undated == int(np.isnat(routes.time).sum())
+    assert len(timeline) + timeline.undated == len(routes)
+    assert np.all(np.diff(timeline.routes.time.astype(np.int64)) >= 0)
+
+
+@pytest.mark.parametrize("freq", list(PERIODS.values()))
+def test_period_stats_match_naive(routes, timeline, freq):
+    stats = timeline.period_stats(freq)
+    exp, _ = naive(routes, stats.index, freq)
+    pd.testing.assert_frame_equal(stats[exp.columns], exp, check_dtype=False)
+    for col in ("flights", "km", "airports", "routes"):
+        src = col if col in ("flights", "km") else f"new_{col}"
+        np.testing.assert_allclose(stats[f"total_{col}"], stats[src].cumsum())
+
+    # km per period equals compute_stats over that period's window
+    for p in stats.index[::max(1, len(stats) // 6)]:
+        w = timeline.window(p.start_time, (p + 1).start_time)
+        assert len(w) == stats.loc[p, "flights"]
+        km = compute_stats(w.routes)["total_km"] if len(w) else 0.0
+        assert stats.loc[p, "km"] == pytest.approx(km, rel=1e-6)
+
+
+@pytest.mark.parametrize("freq", list(PERIODS.values()))
+def test_new_routes_match_naive(routes, timeline, freq):
+    periods, new = timeline.new_routes(freq)
+    _, exp = naive(routes, periods, freq)
+    assert new == exp
+
+
+def test_window_bounds(timeline):
+    start, end = pd.Timestamp("2022-01-01"), pd.Timestamp("2022-07-01")
+    w = timeline.window(start, end)
+    t = timeline.routes.time
+    assert len(w) == int(((t >= start.to_datetime64()) & (t < end.to_datetime64())).sum())
+    assert w.start >= start and w.end < end
+
+
+def test_empty_window(timeline):
+    w = timeline.window("2019-01-01", "2019-02-01")
+    assert len(w) == 0 and w.start is None
+    assert len(w.period_stats("M")) == 0
+    periods, new = w.new_routes("M")
+    assert len(periods) == 0 and new == []
+    fig = build_timeline_figure(w, {}, "M")
+    assert not fig.frames and not fig.layout.sliders
+
+
+def test_too_many_frames(timeline):
+    assert len(timeline.periods("D")[0]) > MAX_FRAMES
+    with pytest.raises(ValueError):
+        build_timeline_figure(timeline, {}, "D")
+    fig = build_timeline_figure(timeline, compute_stats(timeline.routes), "Q")
+    assert len(fig.frames) == len(timeline.periods("Q")[0]) <= MAX_FRAMES